@@ -1,12 +1,19 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
+from utils import configure_torch_threads, count_at_or_above, create_directories, save_uploaded_file, remove_saved_file, format_score, format_scores
+
+# Size torch thread pools before sentence-transformers is imported
+configure_torch_threads()
+
 from resume_parser import ResumeParser
 from job_matcher import JobMatcher
-from utils import create_directories, save_uploaded_file, format_score
+from embedding_cache import EmbeddingCache
 
 # Page configuration
 st.set_page_config(
@@ -53,6 +60,166 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_parser():
+    """Load the resume parser once per process."""
+    return ResumeParser()
+
+@st.cache_resource
+def get_matcher():
+    """Load the S-BERT job matcher once per process."""
+    return JobMatcher(
+        embedding_cache=EmbeddingCache("embeddings_cache"),
+        backend=os.getenv('SBERT_BACKEND', 'torch')
+    )
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def analyze_job_description(job_description):
+    """Analyze a job description, cached on its text."""
+    return get_matcher().analyze_job_description(job_description)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def extract_resume_information(resume_text):
+    """Extract structured resume information, cached on the resume text."""
+    return get_parser().extract_information(resume_text)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def build_export_report(results):
+    """Build the export table and its CSV bytes, cached on the results."""
+    infos = [r['resume_info'] for r in results]
+    scores = np.fromiter((r['similarity_score'] for r in results), dtype=np.float64, count=len(results))
+    
+    df = pd.DataFrame({
+        'Rank': np.arange(1, len(results) + 1),
+        'Filename': [r['filename'] for r in results],
+        'Similarity Score': format_scores(scores),
+        'Skills': [", ".join(info['skills'][:5]) for info in infos],
+        'Education': [", ".join(info['education'][:3]) for info in infos],
+        'Experience': [", ".join(info['experience'][:3]) for info in infos]
+    })
+    csv = df.to_csv(index=False, lineterminator='\n').encode('utf-8')
+    return df, csv
+
+@st.cache_resource
+def init_directories():
+    """Create the working directories once per process."""
+    create_directories()
+
+def parse_uploaded_resume(uploaded_file, resume_parser):
+    """Save, parse and extract information from one uploaded resume."""
+    file_path = save_uploaded_file(uploaded_file)
+    try:
+        resume_text = resume_parser.parse_resume(file_path)
+    finally:
+        # Every save writes a new file, so remove it once it has been read
+        remove_saved_file(file_path)
+    if not resume_text:
+        return None, None
+    return resume_text, extract_resume_information(resume_text)
+
+@st.fragment
+def render_results_cards(results):
+    """Render the ranked resume cards; View Details reruns only this fragment."""
+    for i, result in enumerate(results):
+        score = result['similarity_score']
+        score_class = "high-score" if score >= 0.7 else "medium-score" if score >= 0.5 else "low-score"
+        
+        with st.container():
+            st.markdown(f"""
+            <div class="resume-card {score_class}">
+                <h4>#{i+1} {result['filename']}</h4>
+                <p><strong>Match Score: {score:.1%}</strong></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            col_a, col_b = st.columns([2, 1])
+            
+            with col_a:
+                info = result['resume_info']
+                if info['skills']:
+                    st.write("**Skills:**", ", ".join(info['skills'][:5]))
+                if info['education']:
+                    st.write("**Education:**", ", ".join(info['education'][:3]))
+                if info['experience']:
+                    st.write("**Experience:**", ", ".join(info['experience'][:3]))
+            
+            with col_b:
+                if st.button(f"View Details", key=f"details_{i}"):
+                    with st.expander(f"📄 {result['filename']} - Full Details", expanded=True):
+                        st.write("**Resume Text Preview:**")
+                        st.text(result['resume_text'])
+                        
+                        st.write("**Extracted Information:**")
+                        st.json(result['resume_info'])
+
+@st.fragment
+def render_analytics(results, scores):
+    """Render the analytics charts and export section as an independent fragment."""
+    # Score distribution
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig_hist = px.histogram(
+            x=scores,
+            nbins=10,
+            title="Score Distribution",
+            labels={'x': 'Similarity Score', 'y': 'Number of Resumes'}
+        )
+        fig_hist.update_layout(showlegend=False)
+        st.plotly_chart(fig_hist, use_container_width=True)
+    
+    with col2:
+        # Top candidates
+        top_5 = results[:5]
+        fig_bar = px.bar(
+            x=scores[:5],
+            y=[r['filename'] for r in top_5],
+            orientation='h',
+            title="Top 5 Candidates",
+            labels={'x': 'Similarity Score', 'y': 'Resume'}
+        )
+        fig_bar.update_layout(yaxis={'categoryorder': 'total ascending'})
+        st.plotly_chart(fig_bar, use_container_width=True)
+    
+    # Skills analysis
+    st.subheader("🔧 Skills Analysis")
+    all_skills = []
+    for result in results:
+        all_skills.extend(result['resume_info']['skills'])
+    
+    if all_skills:
+        from collections import Counter
+        skill_counts = Counter(all_skills)
+        top_skills = skill_counts.most_common(10)
+        
+        if top_skills:
+            fig_skills = px.bar(
+                x=[count for skill, count in top_skills],
+                y=[skill for skill, count in top_skills],
+                orientation='h',
+                title="Most Common Skills Across Resumes"
+            )
+            fig_skills.update_layout(yaxis={'categoryorder': 'total ascending'})
+            st.plotly_chart(fig_skills, use_container_width=True)
+    
+    # Export results
+    st.subheader("📊 Export Results")
+    
+    # Prepare data for export
+    df, csv = build_export_report(results)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label="📥 Download CSV Report",
+            data=csv,
+            file_name=f"smarthire_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            mime="text/csv"
+        )
+    
+    with col2:
+        st.dataframe(df, use_container_width=True)
+
 def main():
     # Header
     st.markdown("""
@@ -64,9 +231,9 @@ def main():
     """, unsafe_allow_html=True)
     
     # Initialize components
-    create_directories()
-    resume_parser = ResumeParser()
-    job_matcher = JobMatcher()
+    init_directories()
+    resume_parser = get_parser()
+    job_matcher = get_matcher()
     
     # Sidebar
     with st.sidebar:
@@ -108,7 +275,7 @@ def main():
             # Job analysis
             if job_description:
                 with st.expander("🔍 Job Description Analysis"):
-                    analysis = job_matcher.analyze_job_description(job_description)
+                    analysis = analyze_job_description(job_description)
                     
                     col_a, col_b = st.columns(2)
                     with col_a:
@@ -143,6 +310,10 @@ def main():
         
         # Process resumes
         if st.button("🚀 Start Screening Process", type="primary", use_container_width=True):
+            # Never show the previous run's results under a new job description
+            st.session_state.pop('screening_results', None)
+            st.session_state.pop('screening_scores', None)
+            
             if not job_description:
                 st.error("❌ Please enter a job description first!")
                 return
@@ -156,39 +327,48 @@ def main():
             status_text = st.empty()
             
             results = []
+            resume_texts = []
             total_files = len(uploaded_files)
             
-            for i, uploaded_file in enumerate(uploaded_files):
-                status_text.text(f"Processing {uploaded_file.name}...")
-                progress_bar.progress((i + 1) / total_files)
+            # Phase 1: parse and extract information from every resume concurrently
+            parsed = [None] * total_files
+            status_text.text(f"Processing {total_files} resume(s)...")
+            with ThreadPoolExecutor(max_workers=min(8, total_files)) as executor:
+                futures = {
+                    executor.submit(parse_uploaded_resume, uploaded_file, resume_parser): i
+                    for i, uploaded_file in enumerate(uploaded_files)
+                }
+                for completed, future in enumerate(as_completed(futures), start=1):
+                    i = futures[future]
+                    status_text.text(f"Processed {uploaded_files[i].name}")
+                    try:
+                        parsed[i] = future.result()
+                    except Exception as e:
+                        st.error(f"❌ Error processing {uploaded_files[i].name}: {str(e)}")
+                    progress_bar.progress(completed / (total_files + 1))
+            
+            # Keep results in upload order
+            for uploaded_file, outcome in zip(uploaded_files, parsed):
+                if outcome is None:
+                    continue
                 
-                try:
-                    # Save uploaded file
-                    file_path = save_uploaded_file(uploaded_file)
-                    
-                    # Parse resume
-                    resume_text = resume_parser.parse_resume(file_path)
-                    
-                    if resume_text:
-                        # Extract information
-                        resume_info = resume_parser.extract_information(resume_text)
-                        
-                        # Calculate similarity
-                        similarity_score = job_matcher.calculate_similarity(
-                            job_description, resume_text
-                        )
-                        
-                        results.append({
-                            'filename': uploaded_file.name,
-                            'similarity_score': similarity_score,
-                            'resume_info': resume_info,
-                            'resume_text': resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
-                        })
-                    else:
-                        st.warning(f"⚠️ Could not extract text from {uploaded_file.name}")
-                        
-                except Exception as e:
-                    st.error(f"❌ Error processing {uploaded_file.name}: {str(e)}")
+                resume_text, resume_info = outcome
+                if resume_text:
+                    resume_texts.append(resume_text)
+                    results.append({
+                        'filename': uploaded_file.name,
+                        'resume_info': resume_info,
+                        'resume_text': resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
+                    })
+                else:
+                    st.warning(f"⚠️ Could not extract text from {uploaded_file.name}")
+            
+            # Phase 2: score all resumes with a single batched S-BERT pass
+            if results:
+                status_text.text("Calculating similarity scores...")
+                scores = job_matcher.calculate_similarities_batch(job_description, resume_texts)
+                for result, score in zip(results, scores):
+                    result['similarity_score'] = float(score)
             
             progress_bar.progress(1.0)
             status_text.text("✅ Processing complete!")
@@ -199,145 +379,46 @@ def main():
                 
                 # Store results in session state
                 st.session_state['screening_results'] = results
+                st.session_state['screening_scores'] = np.fromiter(
+                    (r['similarity_score'] for r in results), dtype=np.float32, count=len(results)
+                )
                 st.session_state['job_description'] = job_description
-                
-                # Display results
-                st.header("🏆 Screening Results")
-                
-                # Summary metrics
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric("Total Resumes", len(results))
-                
-                with col2:
-                    avg_score = sum(r['similarity_score'] for r in results) / len(results)
-                    st.metric("Average Score", f"{avg_score:.1%}")
-                
-                with col3:
-                    high_score_count = sum(1 for r in results if r['similarity_score'] >= 0.7)
-                    st.metric("High Match (≥70%)", high_score_count)
-                
-                with col4:
-                    best_score = max(r['similarity_score'] for r in results)
-                    st.metric("Best Score", f"{best_score:.1%}")
-                
-                # Detailed results
-                for i, result in enumerate(results):
-                    score = result['similarity_score']
-                    score_class = "high-score" if score >= 0.7 else "medium-score" if score >= 0.5 else "low-score"
-                    
-                    with st.container():
-                        st.markdown(f"""
-                        <div class="resume-card {score_class}">
-                            <h4>#{i+1} {result['filename']}</h4>
-                            <p><strong>Match Score: {score:.1%}</strong></p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        col_a, col_b = st.columns([2, 1])
-                        
-                        with col_a:
-                            info = result['resume_info']
-                            if info['skills']:
-                                st.write("**Skills:**", ", ".join(info['skills'][:5]))
-                            if info['education']:
-                                st.write("**Education:**", ", ".join(info['education'][:3]))
-                            if info['experience']:
-                                st.write("**Experience:**", ", ".join(info['experience'][:3]))
-                        
-                        with col_b:
-                            if st.button(f"View Details", key=f"details_{i}"):
-                                with st.expander(f"📄 {result['filename']} - Full Details", expanded=True):
-                                    st.write("**Resume Text Preview:**")
-                                    st.text(result['resume_text'])
-                                    
-                                    st.write("**Extracted Information:**")
-                                    st.json(result['resume_info'])
-    
-    with tab2:
-        st.header("📈 Analytics Dashboard")
         
+        # Display results from session state so reruns (e.g. View Details) don't re-run screening
         if 'screening_results' in st.session_state:
             results = st.session_state['screening_results']
+            scores = st.session_state['screening_scores']
+            
+            st.header("🏆 Screening Results")
             
-            # Score distribution
-            col1, col2 = st.columns(2)
+            # Summary metrics
+            col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                scores = [r['similarity_score'] for r in results]
-                fig_hist = px.histogram(
-                    x=scores,
-                    nbins=10,
-                    title="Score Distribution",
-                    labels={'x': 'Similarity Score', 'y': 'Number of Resumes'}
-                )
-                fig_hist.update_layout(showlegend=False)
-                st.plotly_chart(fig_hist, use_container_width=True)
+                st.metric("Total Resumes", len(results))
             
             with col2:
-                # Top candidates
-                top_5 = results[:5]
-                fig_bar = px.bar(
-                    x=[r['similarity_score'] for r in top_5],
-                    y=[r['filename'] for r in top_5],
-                    orientation='h',
-                    title="Top 5 Candidates",
-                    labels={'x': 'Similarity Score', 'y': 'Resume'}
-                )
-                fig_bar.update_layout(yaxis={'categoryorder': 'total ascending'})
-                st.plotly_chart(fig_bar, use_container_width=True)
-            
-            # Skills analysis
-            st.subheader("🔧 Skills Analysis")
-            all_skills = []
-            for result in results:
-                all_skills.extend(result['resume_info']['skills'])
-            
-            if all_skills:
-                from collections import Counter
-                skill_counts = Counter(all_skills)
-                top_skills = skill_counts.most_common(10)
-                
-                if top_skills:
-                    fig_skills = px.bar(
-                        x=[count for skill, count in top_skills],
-                        y=[skill for skill, count in top_skills],
-                        orientation='h',
-                        title="Most Common Skills Across Resumes"
-                    )
-                    fig_skills.update_layout(yaxis={'categoryorder': 'total ascending'})
-                    st.plotly_chart(fig_skills, use_container_width=True)
+                avg_score = float(scores.mean())
+                st.metric("Average Score", f"{avg_score:.1%}")
             
-            # Export results
-            st.subheader("📊 Export Results")
+            with col3:
+                high_score_count = int(count_at_or_above(scores, [0.7])[0])
+                st.metric("High Match (≥70%)", high_score_count)
             
-            # Prepare data for export
-            export_data = []
-            for i, result in enumerate(results):
-                export_data.append({
-                    'Rank': i + 1,
-                    'Filename': result['filename'],
-                    'Similarity Score': f"{result['similarity_score']:.1%}",
-                    'Skills': ", ".join(result['resume_info']['skills'][:5]),
-                    'Education': ", ".join(result['resume_info']['education'][:3]),
-                    'Experience': ", ".join(result['resume_info']['experience'][:3])
-                })
-            
-            df = pd.DataFrame(export_data)
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download CSV Report",
-                    data=csv,
-                    file_name=f"smarthire_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
+            with col4:
+                best_score = float(scores.max())
+                st.metric("Best Score", f"{best_score:.1%}")
             
-            with col2:
-                st.dataframe(df, use_container_width=True)
+            # Detailed results
+            render_results_cards(results)
+    
+    with tab2:
+        st.header("📈 Analytics Dashboard")
+        
+        if 'screening_results' in st.session_state:
+            results = st.session_state['screening_results']
+            scores = st.session_state['screening_scores']
+            render_analytics(results, scores)
         
         else:
             st.info("📊 Run the screening process first to see analytics!")
@@ -364,6 +445,12 @@ def main():
             - **File Parsing:** PyMuPDF, python-docx
             - **Visualization:** Plotly
             """)
+            
+            st.caption(
+                "S-BERT reads at most 256 tokens per text, so resumes are trimmed to "
+                "about 2,000 characters before embedding; longer resumes are scored on "
+                "their opening sections."
+            )
         
         with col2:
             st.subheader("✨ Key Features")
@@ -4,18 +4,23 @@ Main Streamlit application with authentication and data persistence
 """
 
 import streamlit as st
-import pandas as pd
+import numpy as np
 import os
-import json
+import hashlib
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-import plotly.express as px
-import plotly.graph_objects as go
-from resume_parser import ResumeParser
-from job_matcher import JobMatcher
-from utils import create_directories, save_uploaded_file, format_score
-from database import db_manager, init_database, get_database_info
+from utils import configure_torch_threads, count_at_or_above, create_directories, save_uploaded_file, remove_saved_file, format_score, format_scores
+from database import db_manager, init_database, get_database_info, DatabaseEmbeddingCache
 from config.config import Config
 
+# Minimum delay between login attempts, each of which runs a bcrypt check
+LOGIN_RETRY_SECONDS = 1
+
+# Upper bound on concurrent resume parses
+MAX_PARSE_WORKERS = 8
+
 # Page configuration
 st.set_page_config(
     page_title="SmartHire.AI - Resume Screening System",
@@ -74,6 +79,175 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_matcher():
+    """Load the S-BERT job matcher once per process."""
+    # Size torch thread pools before sentence-transformers is imported
+    configure_torch_threads()
+    from job_matcher import JobMatcher
+    
+    # Settings added after the first release default to the baseline behavior,
+    # so config/config.py files generated before them keep working
+    return JobMatcher(
+        model_name=Config.SBERT_MODEL,
+        embedding_cache=DatabaseEmbeddingCache(db_manager),
+        backend=getattr(Config, 'SBERT_BACKEND', 'torch'),
+        onnx_quantization=getattr(Config, 'SBERT_ONNX_QUANTIZATION', 'avx2'),
+        compile_model=getattr(Config, 'SBERT_COMPILE', False),
+        quantize=getattr(Config, 'SBERT_QUANTIZE', False),
+        encode_processes=getattr(Config, 'SBERT_ENCODE_PROCESSES', 0)
+    )
+
+@st.cache_resource
+def get_parse_pool():
+    """Start the resume parsing thread pool once per process."""
+    # Threads rather than forked processes: forking the multithreaded server
+    # after torch is loaded can deadlock, and threads share one spaCy model.
+    # Threads are started on demand, so a batch never uses more than one per file.
+    return ThreadPoolExecutor(max_workers=min(MAX_PARSE_WORKERS, os.cpu_count() or 1))
+
+def parse_saved_resume(file_path):
+    """Parse a saved upload in the parse pool, then delete the saved file."""
+    from resume_parser import parse_resume_file
+    
+    try:
+        return parse_resume_file(file_path)
+    finally:
+        remove_saved_file(file_path)
+
+def submit_resume_parses(uploaded_files):
+    """
+    Start parsing uploaded resumes in the background.
+    
+    Futures are kept in session state keyed by file name and a hash of the
+    file's content, so each upload is parsed once, a replaced file is parsed
+    again, and parsing overlaps with the user filling in the rest of the form.
+    
+    Args:
+        uploaded_files: Streamlit uploaded file objects
+        
+    Returns:
+        List of (filename, future) pairs in upload order; the future is None
+        if the file could not be saved
+    """
+    pending = st.session_state.setdefault('pending_parses', {})
+    keys = [
+        (uploaded_file.name, hashlib.sha256(uploaded_file.getvalue()).hexdigest())
+        for uploaded_file in uploaded_files
+    ]
+    
+    # Forget files that were removed from the uploader
+    for key in set(pending) - set(keys):
+        pending.pop(key).cancel()
+    
+    parse_jobs = []
+    for key, uploaded_file in zip(keys, uploaded_files):
+        if key not in pending:
+            try:
+                file_path = save_uploaded_file(uploaded_file)
+                future = get_parse_pool().submit(parse_saved_resume, file_path)
+                # A parse cancelled before it started never reaches its own cleanup
+                future.add_done_callback(
+                    lambda done, path=file_path: done.cancelled() and remove_saved_file(path)
+                )
+                pending[key] = future
+            except Exception as e:
+                st.error(f"❌ Error processing {uploaded_file.name}: {str(e)}")
+        parse_jobs.append((uploaded_file.name, pending.get(key)))
+    
+    return parse_jobs
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def build_export_report(session_id, _results):
+    """Build the export table and its CSV bytes, cached on the screening session ID."""
+    import pandas as pd
+    
+    infos = [r['resume_info'] for r in _results]
+    scores = np.fromiter((r['similarity_score'] for r in _results), dtype=np.float64, count=len(_results))
+    df = pd.DataFrame({
+        'Rank': np.arange(1, len(_results) + 1),
+        'Filename': [r['filename'] for r in _results],
+        'Similarity Score': format_scores(scores),
+        'Skills': [", ".join(info['skills'][:5]) for info in infos],
+        'Education': [", ".join(info['education'][:3]) for info in infos],
+        'Experience': [", ".join(info['experience'][:3]) for info in infos]
+    })
+    csv = df.to_csv(index=False, lineterminator='\n').encode('utf-8')
+    return df, csv
+
+@st.fragment
+def render_results_cards(results):
+    """Render the ranked resume cards; View Details reruns only this fragment."""
+    for i, result in enumerate(results):
+        score = result['similarity_score']
+        score_class = "high-score" if score >= 0.7 else "medium-score" if score >= 0.5 else "low-score"
+        
+        with st.container():
+            st.markdown(f"""
+            <div class="resume-card {score_class}">
+                <h4>#{i+1} {result['filename']}</h4>
+                <p><strong>Match Score: {score:.1%}</strong></p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            col_a, col_b = st.columns([2, 1])
+            
+            with col_a:
+                info = result['resume_info']
+                if info['skills']:
+                    st.write("**Skills:**", ", ".join(info['skills'][:5]))
+                if info['education']:
+                    st.write("**Education:**", ", ".join(info['education'][:3]))
+                if info['experience']:
+                    st.write("**Experience:**", ", ".join(info['experience'][:3]))
+            
+            with col_b:
+                if st.button(f"View Details", key=f"details_{i}"):
+                    with st.expander(f"📄 {result['filename']} - Full Details", expanded=True):
+                        st.write("**Resume Text Preview:**")
+                        st.text(result['resume_text'])
+                        
+                        st.write("**Extracted Information:**")
+                        st.json(result['resume_info'])
+
+@st.cache_resource
+def init_directories():
+    """Create the working directories once per process."""
+    create_directories()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_job_postings(limit=50):
+    """Read job postings, cached briefly across reruns."""
+    return db_manager.get_job_postings(limit=limit)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_screening_sessions(limit=50):
+    """Read screening sessions, cached briefly across reruns."""
+    return db_manager.get_screening_sessions(limit=limit)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_analysis_counts():
+    """Read the number of analyses per session, cached briefly across reruns."""
+    return db_manager.get_analysis_counts_by_session()
+
+@st.cache_data(ttl=15, show_spinner=False)
+def load_database_info():
+    """Read database status and statistics, cached briefly across reruns."""
+    return get_database_info()
+
+@st.cache_data(ttl=15, show_spinner=False)
+def load_analysis_statistics():
+    """Read overall analysis statistics, cached briefly across reruns."""
+    return db_manager.get_analysis_statistics()
+
+def clear_db_read_caches():
+    """Drop cached database reads after a write."""
+    load_job_postings.clear()
+    load_screening_sessions.clear()
+    load_analysis_counts.clear()
+    load_database_info.clear()
+    load_analysis_statistics.clear()
+
 def login_page():
     """Display login page."""
     st.markdown("""
@@ -102,16 +276,14 @@ def login_page():
                 register_button = st.form_submit_button("Register", use_container_width=True)
             
             if login_button:
-                if username and password:
-                    if db_manager.verify_password(username, password):
-                        user = db_manager.get_user_by_username(username)
+                if time.time() - st.session_state.get('last_login_attempt', 0) < LOGIN_RETRY_SECONDS:
+                    st.error("❌ Please wait a moment before trying again")
+                elif username and password:
+                    st.session_state.last_login_attempt = time.time()
+                    user = db_manager.authenticate(username, password)
+                    if user:
                         st.session_state.logged_in = True
-                        st.session_state.user = {
-                            'id': user.id,
-                            'username': user.username,
-                            'email': user.email,
-                            'role': user.role
-                        }
+                        st.session_state.user = user
                         st.success("✅ Login successful!")
                         st.rerun()
                     else:
@@ -155,9 +327,8 @@ def main_app():
     """, unsafe_allow_html=True)
     
     # Initialize components
-    create_directories()
-    resume_parser = ResumeParser()
-    job_matcher = JobMatcher()
+    init_directories()
+    job_matcher = get_matcher()
     
     # Sidebar
     with st.sidebar:
@@ -193,7 +364,7 @@ def main_app():
         """)
         
         # Database info
-        db_info = get_database_info()
+        db_info = load_database_info()
         st.header("🗄️ Database Status")
         if db_info['status'] == 'connected':
             st.success("✅ Connected")
@@ -213,7 +384,7 @@ def main_app():
             st.header("📝 Job Description")
             
             # Load saved job postings
-            job_postings = db_manager.get_job_postings(limit=10)
+            job_postings = load_job_postings(limit=10)
             job_options = ["Enter new job description"] + [f"{job.title} (ID: {job.id})" for job in job_postings]
             
             selected_job = st.selectbox("Select existing job or create new:", job_options)
@@ -233,6 +404,7 @@ def main_app():
                         created_by=st.session_state.user['id']
                     )
                     if saved_job:
+                        clear_db_read_caches()
                         st.success(f"✅ Job posting saved with ID: {saved_job.id}")
                         st.rerun()
             else:
@@ -279,6 +451,9 @@ def main_app():
             if uploaded_files:
                 st.success(f"✅ {len(uploaded_files)} resume(s) uploaded successfully!")
                 
+                # Parse in the background while the rest of the form is filled in
+                submit_resume_parses(uploaded_files)
+                
                 # Display uploaded files
                 with st.expander("📁 Uploaded Files"):
                     for file in uploaded_files:
@@ -286,6 +461,10 @@ def main_app():
         
         # Process resumes
         if st.button("🚀 Start Screening Process", type="primary", use_container_width=True):
+            # Never show the previous run's results under a new job description
+            st.session_state.pop('screening_results', None)
+            st.session_state.pop('screening_scores', None)
+            
             if not job_description:
                 st.error("❌ Please enter a job description first!")
                 return
@@ -309,144 +488,132 @@ def main_app():
                 )
                 job_posting_id = temp_job.id
             
-            screening_session = db_manager.create_screening_session(
-                job_posting_id=job_posting_id,
-                session_name=session_name,
-                created_by=st.session_state.user['id']
-            )
-            
-            if not screening_session:
-                st.error("❌ Failed to create screening session!")
-                return
-            
             # Progress tracking
             progress_bar = st.progress(0)
             status_text = st.empty()
             
             results = []
+            analyses = []
             total_files = len(uploaded_files)
             
-            for i, uploaded_file in enumerate(uploaded_files):
-                status_text.text(f"Processing {uploaded_file.name}...")
-                progress_bar.progress((i + 1) / total_files)
+            # Phase 1: collect the background parses, submitting any that have not started
+            parse_jobs = submit_resume_parses(uploaded_files)
+            futures = {future: i for i, (_, future) in enumerate(parse_jobs) if future is not None}
+            
+            parsed_by_index = {}
+            for done, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                filename = parse_jobs[i][0]
+                status_text.text(f"Processing {filename}...")
+                progress_bar.progress(done / total_files)
                 
                 try:
-                    # Save uploaded file
-                    file_path = save_uploaded_file(uploaded_file)
-                    
-                    # Parse resume
-                    resume_text = resume_parser.parse_resume(file_path)
-                    
+                    _, resume_text, resume_info = future.result()
                     if resume_text:
-                        # Extract information
-                        resume_info = resume_parser.extract_information(resume_text)
-                        
-                        # Calculate similarity
-                        similarity_score = job_matcher.calculate_similarity(
-                            job_description, resume_text
-                        )
-                        
-                        # Save to database
-                        analysis_data = {
+                        parsed_by_index[i] = (filename, resume_text, resume_info)
+                    else:
+                        st.warning(f"⚠️ Could not extract text from {filename}")
+                except Exception as e:
+                    st.error(f"❌ Error processing {filename}: {str(e)}")
+            
+            # Keep upload order so the ranking is stable for equal scores
+            parsed = [parsed_by_index[i] for i in sorted(parsed_by_index)]
+            
+            # Phase 2: score all resumes with a single batched S-BERT pass
+            if parsed:
+                status_text.text("Calculating similarity scores...")
+                scores, embeddings = job_matcher.calculate_similarities_batch(
+                    job_description, [resume_text for _, resume_text, _ in parsed], return_embeddings=True
+                )
+                
+                for i, ((filename, resume_text, resume_info), score) in enumerate(zip(parsed, scores)):
+                    similarity_score = float(score)
+                    
+                    analyses.append({
+                        'filename': filename,
+                        'similarity_score': similarity_score,
+                        'skills': resume_info['skills'],
+                        'education': resume_info['education'],
+                        'experience': resume_info['experience'],
+                        'analysis_data': {
                             'resume_text_preview': resume_text[:500] + "..." if len(resume_text) > 500 else resume_text,
                             'word_count': len(resume_text.split()),
                             'contact_info': resume_info.get('contact', {}),
                             'years_of_experience': resume_info.get('years_of_experience')
-                        }
-                        
-                        db_manager.save_resume_analysis(
-                            session_id=screening_session.id,
-                            filename=uploaded_file.name,
-                            similarity_score=similarity_score,
-                            skills=resume_info['skills'],
-                            education=resume_info['education'],
-                            experience=resume_info['experience'],
-                            analysis_data=analysis_data
-                        )
-                        
-                        results.append({
-                            'filename': uploaded_file.name,
-                            'similarity_score': similarity_score,
-                            'resume_info': resume_info,
-                            'resume_text': resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
-                        })
-                    else:
-                        st.warning(f"⚠️ Could not extract text from {uploaded_file.name}")
-                        
-                except Exception as e:
-                    st.error(f"❌ Error processing {uploaded_file.name}: {str(e)}")
+                        },
+                        'embedding': embeddings[i] if embeddings is not None else None
+                    })
+                    
+                    results.append({
+                        'filename': filename,
+                        'similarity_score': similarity_score,
+                        'resume_info': resume_info,
+                        'resume_text': resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
+                    })
+            
+            # Create the screening session and save all analyses in one transaction
+            status_text.text("Saving results...")
+            screening_session = db_manager.save_screening_batch(
+                job_posting_id=job_posting_id,
+                session_name=session_name,
+                analyses=analyses,
+                created_by=st.session_state.user['id']
+            )
+            
+            if not screening_session:
+                st.error("❌ Failed to save screening session!")
+                return
             
             progress_bar.progress(1.0)
             status_text.text("✅ Processing complete!")
+            clear_db_read_caches()
             
             if results:
-                # Sort by similarity score
-                results.sort(key=lambda x: x['similarity_score'], reverse=True)
+                # Sort by similarity score; the stable sort keeps upload order for ties
+                scores = np.fromiter((r['similarity_score'] for r in results), dtype=np.float32, count=len(results))
+                order = np.argsort(-scores, kind='stable')
+                results = [results[i] for i in order]
+                scores = scores[order]
                 
                 # Store results in session state
                 st.session_state['screening_results'] = results
+                st.session_state['screening_scores'] = scores
                 st.session_state['job_description'] = job_description
                 st.session_state['session_id'] = screening_session.id
                 
-                # Display results
-                st.header("🏆 Screening Results")
-                
-                # Summary metrics
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric("Total Resumes", len(results))
-                
-                with col2:
-                    avg_score = sum(r['similarity_score'] for r in results) / len(results)
-                    st.metric("Average Score", f"{avg_score:.1%}")
-                
-                with col3:
-                    high_score_count = sum(1 for r in results if r['similarity_score'] >= 0.7)
-                    st.metric("High Match (≥70%)", high_score_count)
-                
-                with col4:
-                    best_score = max(r['similarity_score'] for r in results)
-                    st.metric("Best Score", f"{best_score:.1%}")
-                
-                # Detailed results
-                for i, result in enumerate(results):
-                    score = result['similarity_score']
-                    score_class = "high-score" if score >= 0.7 else "medium-score" if score >= 0.5 else "low-score"
-                    
-                    with st.container():
-                        st.markdown(f"""
-                        <div class="resume-card {score_class}">
-                            <h4>#{i+1} {result['filename']}</h4>
-                            <p><strong>Match Score: {score:.1%}</strong></p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        col_a, col_b = st.columns([2, 1])
-                        
-                        with col_a:
-                            info = result['resume_info']
-                            if info['skills']:
-                                st.write("**Skills:**", ", ".join(info['skills'][:5]))
-                            if info['education']:
-                                st.write("**Education:**", ", ".join(info['education'][:3]))
-                            if info['experience']:
-                                st.write("**Experience:**", ", ".join(info['experience'][:3]))
-                        
-                        with col_b:
-                            if st.button(f"View Details", key=f"details_{i}"):
-                                with st.expander(f"📄 {result['filename']} - Full Details", expanded=True):
-                                    st.write("**Resume Text Preview:**")
-                                    st.text(result['resume_text'])
-                                    
-                                    st.write("**Extracted Information:**")
-                                    st.json(result['resume_info'])
+        # Display results from session state so reruns (e.g. View Details) don't re-run screening
+        if 'screening_results' in st.session_state:
+            results = st.session_state['screening_results']
+            scores = st.session_state['screening_scores']
+            
+            st.header("🏆 Screening Results")
+            
+            # Summary metrics
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric("Total Resumes", len(results))
+            
+            with col2:
+                avg_score = float(scores.mean())
+                st.metric("Average Score", f"{avg_score:.1%}")
+            
+            with col3:
+                high_score_count = int(count_at_or_above(scores, [0.7])[0])
+                st.metric("High Match (≥70%)", high_score_count)
+            
+            with col4:
+                best_score = float(scores.max())
+                st.metric("Best Score", f"{best_score:.1%}")
+            
+            # Detailed results
+            render_results_cards(results)
     
     with tab2:
         st.header("📈 Analytics Dashboard")
         
         # Load analytics data from database
-        db_stats = db_manager.get_analysis_statistics()
+        db_stats = load_analysis_statistics()
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -459,13 +626,15 @@ def main_app():
             st.metric("Average Score", f"{db_stats['average_similarity']:.1%}")
         
         if 'screening_results' in st.session_state:
+            import plotly.express as px
+            
             results = st.session_state['screening_results']
+            scores = st.session_state['screening_scores']
             
             # Score distribution
             col1, col2 = st.columns(2)
             
             with col1:
-                scores = [r['similarity_score'] for r in results]
                 fig_hist = px.histogram(
                     x=scores,
                     nbins=10,
@@ -479,7 +648,7 @@ def main_app():
                 # Top candidates
                 top_5 = results[:5]
                 fig_bar = px.bar(
-                    x=[r['similarity_score'] for r in top_5],
+                    x=scores[:5],
                     y=[r['filename'] for r in top_5],
                     orientation='h',
                     title="Top 5 Candidates",
@@ -492,22 +661,10 @@ def main_app():
             st.subheader("📊 Export Results")
             
             # Prepare data for export
-            export_data = []
-            for i, result in enumerate(results):
-                export_data.append({
-                    'Rank': i + 1,
-                    'Filename': result['filename'],
-                    'Similarity Score': f"{result['similarity_score']:.1%}",
-                    'Skills': ", ".join(result['resume_info']['skills'][:5]),
-                    'Education': ", ".join(result['resume_info']['education'][:3]),
-                    'Experience': ", ".join(result['resume_info']['experience'][:3])
-                })
-            
-            df = pd.DataFrame(export_data)
+            df, csv = build_export_report(st.session_state['session_id'], results)
             
             col1, col2 = st.columns(2)
             with col1:
-                csv = df.to_csv(index=False)
                 st.download_button(
                     label="📥 Download CSV Report",
                     data=csv,
@@ -530,9 +687,15 @@ def main_app():
         with col1:
             st.subheader("📝 Saved Job Postings")
             
-            job_postings = db_manager.get_job_postings(limit=20)
+            job_postings = load_job_postings(limit=20)
             
             if job_postings:
+                # Fetch sessions and analysis counts once instead of per job
+                sessions_by_job = defaultdict(list)
+                for session in load_screening_sessions():
+                    sessions_by_job[session.job_posting_id].append(session)
+                analysis_counts = load_analysis_counts()
+                
                 for job in job_postings:
                     with st.expander(f"📄 {job.title} (ID: {job.id})"):
                         st.write(f"**Created:** {job.created_at}")
@@ -540,12 +703,11 @@ def main_app():
                         st.text(job.description[:300] + "..." if len(job.description) > 300 else job.description)
                         
                         # Show screening sessions for this job
-                        sessions = [s for s in db_manager.get_screening_sessions() if s.job_posting_id == job.id]
+                        sessions = sessions_by_job.get(job.id, [])
                         if sessions:
                             st.write(f"**Screening Sessions ({len(sessions)}):**")
                             for session in sessions:
-                                analyses = db_manager.get_resume_analyses_by_session(session.id)
-                                st.write(f"• {session.session_name} - {len(analyses)} resumes analyzed")
+                                st.write(f"• {session.session_name} - {analysis_counts.get(session.id, 0)} resumes analyzed")
             else:
                 st.info("No job postings found. Create one in the Resume Screening tab.")
         
@@ -553,13 +715,13 @@ def main_app():
             st.subheader("📊 Quick Stats")
             
             # Recent sessions
-            recent_sessions = db_manager.get_screening_sessions(limit=5)
+            recent_sessions = load_screening_sessions(limit=5)
+            score_stats = db_manager.get_session_score_stats([session.id for session in recent_sessions])
             st.write("**Recent Sessions:**")
             for session in recent_sessions:
-                analyses = db_manager.get_resume_analyses_by_session(session.id)
-                avg_score = sum(json.loads(a.analysis_data).get('similarity_score', 0) for a in analyses) / len(analyses) if analyses else 0
+                avg_score, analysis_count = score_stats.get(session.id, (0.0, 0))
                 st.write(f"• {session.session_name}")
-                st.write(f"  {len(analyses)} resumes, avg: {avg_score:.1%}")
+                st.write(f"  {analysis_count} resumes, avg: {avg_score:.1%}")
     
     with tab4:
         st.header("ℹ️ About SmartHire.AI")
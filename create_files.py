@@ -4,6 +4,11 @@ Run this script to automatically create the project structure
 """
 
 import os
+from pathlib import Path
+
+def _write(path, content, newline="\n"):
+    """Write a UTF-8 text file with a single binary write, optionally with CRLF line endings."""
+    Path(path).write_bytes(content.replace("\n", newline).encode("utf-8"))
 
 def create_project_structure():
     """Create the complete project structure with all files."""
@@ -21,8 +26,14 @@ def create_project_structure():
         "scripts"
     ]
     
-    for directory in directories:
-        os.makedirs(directory, exist_ok=True)
+    # Parents sort before their children, so a single mkdir per directory suffices
+    for directory in sorted(directories, key=lambda d: d.count("/")):
+        try:
+            os.mkdir(directory)
+        except FileExistsError:
+            pass
+        except FileNotFoundError:
+            os.makedirs(directory, exist_ok=True)
         print(f"✅ Created directory: {directory}")
     
     # Create .env file
@@ -32,40 +43,57 @@ APP_NAME=SmartHire.AI
 APP_VERSION=1.0.0
 DEBUG=True
 SECRET_KEY=your-secret-key-change-this-in-production
+BCRYPT_ROUNDS=12
 MAX_FILE_SIZE_MB=10
 ALLOWED_EXTENSIONS=pdf,docx
 SBERT_MODEL=all-MiniLM-L6-v2
+SBERT_BACKEND=torch
+SBERT_ONNX_QUANTIZATION=avx2
+SBERT_COMPILE=False
+SBERT_QUANTIZE=False
+SBERT_ENCODE_PROCESSES=0
 SIMILARITY_THRESHOLD=0.5
 LOG_LEVEL=INFO
 LOG_FILE=logs/smarthire.log
 """
     
-    with open(".env", "w") as f:
-        f.write(env_content)
+    _write(".env", env_content)
     print("✅ Created .env file")
     
     # Create config.py
     config_content = """import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
-load_dotenv()
+@lru_cache(maxsize=1)
+def _load_env():
+    \"\"\"Load .env into the environment once and snapshot the result.\"\"\"
+    load_dotenv()
+    return dict(os.environ)
+
+_env = _load_env()
 
 class Config:
-    DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///data/smarthire.db')
-    APP_NAME = os.getenv('APP_NAME', 'SmartHire.AI')
-    APP_VERSION = os.getenv('APP_VERSION', '1.0.0')
-    DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
-    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
-    MAX_FILE_SIZE_MB = int(os.getenv('MAX_FILE_SIZE_MB', '10'))
-    ALLOWED_EXTENSIONS = os.getenv('ALLOWED_EXTENSIONS', 'pdf,docx').split(',')
-    SBERT_MODEL = os.getenv('SBERT_MODEL', 'all-MiniLM-L6-v2')
-    SIMILARITY_THRESHOLD = float(os.getenv('SIMILARITY_THRESHOLD', '0.5'))
-    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
-    LOG_FILE = os.getenv('LOG_FILE', 'logs/smarthire.log')
+    DATABASE_URL = _env.get('DATABASE_URL', 'sqlite:///data/smarthire.db')
+    APP_NAME = _env.get('APP_NAME', 'SmartHire.AI')
+    APP_VERSION = _env.get('APP_VERSION', '1.0.0')
+    DEBUG = _env.get('DEBUG', 'True').lower() == 'true'
+    SECRET_KEY = _env.get('SECRET_KEY', 'dev-secret-key')
+    BCRYPT_ROUNDS = int(_env.get('BCRYPT_ROUNDS', '12'))
+    MAX_FILE_SIZE_MB = int(_env.get('MAX_FILE_SIZE_MB', '10'))
+    ALLOWED_EXTENSIONS = _env.get('ALLOWED_EXTENSIONS', 'pdf,docx').split(',')
+    SBERT_MODEL = _env.get('SBERT_MODEL', 'all-MiniLM-L6-v2')
+    SBERT_BACKEND = _env.get('SBERT_BACKEND', 'torch')
+    SBERT_ONNX_QUANTIZATION = _env.get('SBERT_ONNX_QUANTIZATION', 'avx2')
+    SBERT_COMPILE = _env.get('SBERT_COMPILE', 'False').lower() == 'true'
+    SBERT_QUANTIZE = _env.get('SBERT_QUANTIZE', 'False').lower() == 'true'
+    SBERT_ENCODE_PROCESSES = int(_env.get('SBERT_ENCODE_PROCESSES', '0'))
+    SIMILARITY_THRESHOLD = float(_env.get('SIMILARITY_THRESHOLD', '0.5'))
+    LOG_LEVEL = _env.get('LOG_LEVEL', 'INFO')
+    LOG_FILE = _env.get('LOG_FILE', 'logs/smarthire.log')
 """
     
-    with open("config/config.py", "w") as f:
-        f.write(config_content)
+    _write("config/config.py", config_content)
     print("✅ Created config/config.py")
     
     # Create Windows batch files
@@ -126,8 +154,7 @@ echo.
 pause
 """
     
-    with open("run_setup.bat", "w") as f:
-        f.write(windows_setup)
+    _write("run_setup.bat", windows_setup, newline="\r\n")
     print("✅ Created run_setup.bat")
     
     # Create run script
@@ -147,8 +174,7 @@ streamlit run app_enhanced.py
 pause
 """
     
-    with open("run_windows.bat", "w") as f:
-        f.write(run_script)
+    _write("run_windows.bat", run_script, newline="\r\n")
     print("✅ Created run_windows.bat")
     
     # Create sample data
@@ -180,8 +206,7 @@ Databases: PostgreSQL, MySQL, MongoDB
 Cloud: AWS, Docker, Kubernetes
 """
     
-    with open("data/sample_resumes/john_doe_resume.txt", "w") as f:
-        f.write(sample_resume)
+    _write("data/sample_resumes/john_doe_resume.txt", sample_resume)
     
     sample_job = """Software Engineer - Full Stack Development
 
@@ -202,8 +227,7 @@ Responsibilities:
 - Participate in code reviews
 """
     
-    with open("data/sample_resumes/sample_job_description.txt", "w") as f:
-        f.write(sample_job)
+    _write("data/sample_resumes/sample_job_description.txt", sample_job)
     
     print("✅ Created sample data files")
     
@@ -212,6 +236,7 @@ Responsibilities:
     print("1. Copy the main Python files (app.py, resume_parser.py, etc.) into this directory")
     print("2. Run: run_setup.bat")
     print("3. Run: run_windows.bat")
+    print("\nOn Linux, see README.md (Database Storage) for keeping the SQLite file on a noatime mount.")
 
 if __name__ == "__main__":
     create_project_structure()
@@ -3,21 +3,193 @@ Database operations for SmartHire.AI
 Handles all database connections and operations using SQLAlchemy
 """
 
-import sqlite3
 import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional, Any
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, DateTime, ForeignKey
+from typing import List, Dict, Iterator, Optional, Any, Tuple
+import numpy as np
+from sqlalchemy import bindparam, create_engine, cast, event, func, insert, inspect, select, text, Column, Integer, String, Text, Float, DateTime, ForeignKey, Index, JSON, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import QueuePool, StaticPool
 from config.config import Config
-import bcrypt
+
+try:
+    import orjson
+    
+    def _json_dumps(value: Any) -> str:
+        """Serialize a JSON column value with orjson."""
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Connections kept open by the pool, and extra ones opened under load
+POOL_SIZE = 10
+POOL_MAX_OVERFLOW = 5
+
+def _engine_options(database_url: str) -> Dict[str, Any]:
+    """Build create_engine() options with an explicitly sized connection pool."""
+    if database_url in ('sqlite://', 'sqlite:///:memory:'):
+        # An in-memory database lives in a single connection
+        return {
+            'echo': Config.DEBUG,
+            'json_serializer': _json_dumps,
+            'json_deserializer': _json_loads,
+            'poolclass': StaticPool,
+            'connect_args': {'check_same_thread': False}
+        }
+    
+    options = {
+        'echo': Config.DEBUG,
+        'query_cache_size': 1200,
+        'json_serializer': _json_dumps,
+        'json_deserializer': _json_loads,
+        'poolclass': QueuePool,
+        'pool_size': POOL_SIZE,
+        'max_overflow': POOL_MAX_OVERFLOW,
+        'pool_timeout': 30,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800
+    }
+    if database_url.startswith('sqlite'):
+        # Pooled connections are reused across Streamlit's script threads
+        options['connect_args'] = {'check_same_thread': False}
+    return options
 
 # Database setup
-engine = create_engine(Config.DATABASE_URL, echo=Config.DEBUG)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(Config.DATABASE_URL, **_engine_options(Config.DATABASE_URL))
+
+if engine.dialect.name == 'sqlite':
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Use WAL journaling and larger caches on every new SQLite connection."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.close()
+# Keep loaded attributes after commit so returned objects are usable without a new SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
+# Version of the table layout, stored in SQLite's user_version; bump it
+# whenever a model, index or data migration changes
+SCHEMA_VERSION = 1
+
+# Maximum number of hashes per IN (...) lookup, kept below SQLite's bound
+# parameter limit
+EMBEDDING_LOOKUP_CHUNK = 500
+
+# analysis_data fields stored outside the JSON blob: the text preview lives in
+# resume_previews, the numeric fields in their own resume_analyses columns
+PREVIEW_KEY = 'resume_text_preview'
+PROMOTED_ANALYSIS_KEYS = ('word_count', 'years_of_experience')
+
+def split_analysis_data(analysis_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str], Dict[str, Any]]:
+    """Split analysis data into promoted column values, text preview and remaining JSON fields."""
+    remaining = dict(analysis_data or {})
+    preview = remaining.pop(PREVIEW_KEY, None)
+    columns = {key: remaining.pop(key, None) for key in PROMOTED_ANALYSIS_KEYS}
+    return columns, preview, remaining
+
+def analysis_row(session_id: int, analysis: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    Convert an analysis into resume_analyses column values and its text preview.
+    
+    Args:
+        session_id (int): Screening session ID
+        analysis (Dict[str, Any]): Analysis with the keyword arguments of
+            save_resume_analysis other than session_id
+        
+    Returns:
+        Tuple[Dict[str, Any], Optional[str]]: Column values and text preview
+    """
+    columns, preview, remaining = split_analysis_data(analysis['analysis_data'])
+    embedding = analysis.get('embedding')
+    row = {
+        'session_id': session_id,
+        'filename': analysis['filename'],
+        'similarity_score': analysis['similarity_score'],
+        'skills_extracted': analysis['skills'],
+        'education_extracted': analysis['education'],
+        'experience_extracted': analysis['experience'],
+        'analysis_data': remaining,
+        'embedding': encode_embedding(embedding) if embedding is not None else None,
+        **columns
+    }
+    return row, preview
+
+def distinct_skills(skills: List[str]) -> List[str]:
+    """Normalize skills the way get_analyses_by_skill looks them up and drop duplicates."""
+    return list(dict.fromkeys(skill.strip().lower() for skill in skills or [] if skill and skill.strip()))
+
+def skill_rows(analysis_id: int, skills: List[str]) -> List[Dict[str, Any]]:
+    """Build resume_skills rows for the distinct skills of an analysis."""
+    return [{'analysis_id': analysis_id, 'skill': skill} for skill in distinct_skills(skills)]
+
+def encode_embedding(embedding: np.ndarray) -> bytes:
+    """Serialize an embedding as float16 bytes for BLOB storage."""
+    return np.asarray(embedding, dtype=np.float16).tobytes()
+
+def decode_embedding(blob: bytes) -> np.ndarray:
+    """Deserialize a float16 BLOB into a float32 embedding."""
+    return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+
+class PackedJSON(TypeDecorator):
+    """JSON value stored as a compressed BLOB behind a one-byte format marker."""
+    
+    impl = LargeBinary
+    cache_ok = True
+    
+    ZLIB = b'\x01'
+    ZSTD = b'\x02'
+    
+    def process_bind_param(self, value, dialect):
+        """Serialize and compress a value, with zstd when it is installed."""
+        if value is None:
+            return None
+        data = _json_dumps(value).encode('utf-8')
+        if zstandard is not None:
+            return self.ZSTD + zstandard.compress(data, 3)
+        return self.ZLIB + zlib.compress(data, 6)
+    
+    def result_processor(self, dialect, coltype):
+        """Read values directly; legacy rows hold TEXT that LargeBinary would reject."""
+        def process(value):
+            return self.process_result_value(value, dialect)
+        return process
+    
+    def process_result_value(self, value, dialect):
+        """Decompress and deserialize a value, accepting legacy JSON text."""
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return _json_loads(value)
+        
+        marker, data = value[:1], value[1:]
+        if marker == self.ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read this analysis data")
+            return _json_loads(zstandard.decompress(data))
+        if marker == self.ZLIB:
+            return _json_loads(zlib.decompress(data))
+        return _json_loads(value)
+
 class User(Base):
     """User model for authentication and authorization."""
     __tablename__ = "users"
@@ -71,14 +243,105 @@ class ResumeAnalysis(Base):
     session_id = Column(Integer, ForeignKey("screening_sessions.id"))
     filename = Column(String(255), nullable=False)
     similarity_score = Column(Float)
-    skills_extracted = Column(Text)  # JSON string
-    education_extracted = Column(Text)  # JSON string
-    experience_extracted = Column(Text)  # JSON string
-    analysis_data = Column(Text)  # JSON string for additional data
+    skills_extracted = Column(JSON)
+    education_extracted = Column(JSON)
+    experience_extracted = Column(JSON)
+    analysis_data = Column(PackedJSON)  # Additional data, compressed
+    word_count = Column(Integer)
+    years_of_experience = Column(Integer)
+    embedding = Column(LargeBinary)  # float16 S-BERT embedding
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     session = relationship("ScreeningSession", back_populates="resume_analyses")
+    preview = relationship("ResumePreview", uselist=False, back_populates="analysis")
+    skills = relationship("ResumeSkill", back_populates="analysis")
+
+# Serve the filtered, score-ordered and newest-first listings straight from an index
+Index("ix_ra_session_score", ResumeAnalysis.session_id, ResumeAnalysis.similarity_score.desc())
+Index("ix_jp_created", JobPosting.created_at.desc())
+Index("ix_ss_created", ScreeningSession.created_at.desc())
+
+class ResumePreview(Base):
+    """Resume text preview, kept apart from the analysis rows it belongs to."""
+    __tablename__ = "resume_previews"
+    
+    analysis_id = Column(Integer, ForeignKey("resume_analyses.id"), primary_key=True)
+    preview = Column(Text)
+    
+    # Relationships
+    analysis = relationship("ResumeAnalysis", back_populates="preview")
+
+class ResumeSkill(Base):
+    """Skill extracted from a resume, one row per analysis and skill."""
+    __tablename__ = "resume_skills"
+    
+    analysis_id = Column(Integer, ForeignKey("resume_analyses.id"), primary_key=True)
+    skill = Column(String(100), primary_key=True)
+    
+    # Relationships
+    analysis = relationship("ResumeAnalysis", back_populates="skills")
+
+# Look up the analyses mentioning a skill without scanning skills_extracted JSON
+Index("ix_rs_skill", ResumeSkill.skill)
+
+class EmbeddingCacheEntry(Base):
+    """Cached S-BERT embedding keyed by a hash of the encoded text."""
+    __tablename__ = "embedding_cache"
+    
+    content_hash = Column(String(64), primary_key=True)
+    embedding = Column(LargeBinary, nullable=False)  # float16 bytes
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# Statements for the hottest lookups, built once and compiled from SQLAlchemy's cache
+USER_BY_USERNAME = select(User).where(User.username == bindparam('username'))
+JOB_POSTING_BY_ID = select(JobPosting).where(JobPosting.id == bindparam('job_id'))
+ANALYSES_BY_SESSION = select(ResumeAnalysis).where(
+    ResumeAnalysis.session_id == bindparam('session_id')
+).order_by(ResumeAnalysis.similarity_score.desc())
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries expire after a fixed time."""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize (int): Number of entries kept before the least recently
+                used ones are dropped
+            ttl (float): Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Get a cached value, or None if it is missing or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        """Cache a value."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached values."""
+        with self._lock:
+            self._data.clear()
 
 class DatabaseManager:
     """Database manager class for handling all database operations."""
@@ -88,10 +351,113 @@ class DatabaseManager:
         self.engine = engine
         self.SessionLocal = SessionLocal
         
+        # Short-lived caches for rows looked up on most requests
+        self._user_cache = TTLCache(maxsize=1024, ttl=60)
+        self._job_posting_cache = TTLCache(maxsize=1024, ttl=60)
+        
     def create_tables(self):
-        """Create all database tables."""
+        """Create all database tables, unless the schema is already up to date."""
+        if self._schema_version() >= SCHEMA_VERSION:
+            return
+        
         Base.metadata.create_all(bind=self.engine)
+        self._migrate_schema()
+        previews_migrated = self._migrate_previews()
+        skills_migrated = self._migrate_skills()
+        
+        # Leave the version unchanged after a failed migration, so the next
+        # start retries it
+        if not (previews_migrated and skills_migrated):
+            return
+        
+        if self.engine.dialect.name == 'sqlite':
+            with self.engine.begin() as connection:
+                connection.exec_driver_sql(f"PRAGMA user_version={SCHEMA_VERSION}")
+    
+    def _schema_version(self) -> int:
+        """Get the schema version recorded in the database, or 0 if unknown."""
+        if self.engine.dialect.name != 'sqlite':
+            return 0
+        with self.engine.connect() as connection:
+            return connection.exec_driver_sql("PRAGMA user_version").scalar() or 0
+    
+    def _migrate_schema(self):
+        """Add columns and indexes introduced after a table was first created."""
+        inspector = inspect(self.engine)
+        with self.engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                existing = {column['name'] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name not in existing:
+                        column_type = column.type.compile(dialect=self.engine.dialect)
+                        connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                        print(f"✅ Added column {table.name}.{column.name}")
+                
+                existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+                for index in table.indexes:
+                    if index.name not in existing_indexes:
+                        index.create(connection)
+                        print(f"✅ Added index {index.name}")
+        
+    def _migrate_previews(self) -> bool:
+        """
+        Move text previews and numeric fields out of legacy analysis_data JSON.
+        
+        Returns:
+            bool: True if the migration succeeded
+        """
+        try:
+            with self.scoped_session() as session:
+                rows = session.query(ResumeAnalysis.id, ResumeAnalysis.analysis_data).filter(
+                    cast(ResumeAnalysis.analysis_data, Text).like(f'%"{PREVIEW_KEY}"%')
+                ).all()
+                
+                for analysis_id, analysis_data in rows:
+                    columns, preview, remaining = split_analysis_data(analysis_data)
+                    session.query(ResumeAnalysis).filter(ResumeAnalysis.id == analysis_id).update(
+                        {**columns, 'analysis_data': remaining}, synchronize_session=False
+                    )
+                    if preview:
+                        session.merge(ResumePreview(analysis_id=analysis_id, preview=preview))
+                
+                session.commit()
+                if rows:
+                    print(f"✅ Moved {len(rows)} resume previews to resume_previews")
+            return True
+                    
+        except Exception as e:
+            print(f"Error migrating resume previews: {str(e)}")
+            return False
+    
+    def _migrate_skills(self) -> bool:
+        """
+        Fill resume_skills from skills_extracted JSON for analyses saved before it existed.
         
+        Returns:
+            bool: True if the migration succeeded
+        """
+        try:
+            with self.scoped_session() as session:
+                if session.query(ResumeSkill.analysis_id).first() is not None:
+                    return True
+                
+                rows = session.query(ResumeAnalysis.id, ResumeAnalysis.skills_extracted).all()
+                
+                skills = [
+                    skill_row
+                    for analysis_id, skills_extracted in rows
+                    for skill_row in skill_rows(analysis_id, skills_extracted)
+                ]
+                if skills:
+                    session.execute(insert(ResumeSkill), skills)
+                    session.commit()
+                    print(f"✅ Indexed skills of {len(rows)} resume analyses in resume_skills")
+            return True
+                    
+        except Exception as e:
+            print(f"Error migrating resume skills: {str(e)}")
+            return False
+    
     def get_session(self):
         """Get database session."""
         return self.SessionLocal()
@@ -100,185 +466,407 @@ class DatabaseManager:
         """Close database session."""
         session.close()
     
+    @contextmanager
+    def scoped_session(self):
+        """Provide a session that is rolled back on error and always closed."""
+        session = self.get_session()
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self.close_session(session)
+    
     # User operations
     def create_user(self, username: str, email: str, password: str, role: str = "user") -> Optional[User]:
         """Create a new user."""
-        session = self.get_session()
+        # bcrypt is imported here so that importing this module stays cheap
+        import bcrypt
+        
         try:
-            # Hash password
-            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            
-            user = User(
-                username=username,
-                email=email,
-                password_hash=password_hash,
-                role=role
-            )
-            
-            session.add(user)
-            session.commit()
-            session.refresh(user)
-            return user
-            
+            with self.scoped_session() as session:
+                # Hash password; configs generated before BCRYPT_ROUNDS existed use bcrypt's default
+                rounds = getattr(Config, 'BCRYPT_ROUNDS', 12)
+                password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+                
+                user = User(
+                    username=username,
+                    email=email,
+                    password_hash=password_hash,
+                    role=role
+                )
+                
+                session.add(user)
+                session.commit()
+                self._user_cache.clear()
+                return user
+                
         except Exception as e:
-            session.rollback()
             print(f"Error creating user: {str(e)}")
             return None
-        finally:
-            self.close_session(session)
     
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username."""
-        session = self.get_session()
-        try:
-            user = session.query(User).filter(User.username == username).first()
+        user = self._user_cache.get(username)
+        if user is not None:
             return user
-        finally:
-            self.close_session(session)
+        
+        with self.scoped_session() as session:
+            user = session.execute(USER_BY_USERNAME, {'username': username}).scalar_one_or_none()
+        
+        if user is not None:
+            self._user_cache.set(username, user)
+        return user
     
     def verify_password(self, username: str, password: str) -> bool:
         """Verify user password."""
-        user = self.get_user_by_username(username)
-        if user:
-            return bcrypt.checkpw(password.encode('utf-8'), user.password_hash.encode('utf-8'))
-        return False
+        return self.authenticate(username, password) is not None
+    
+    def authenticate(self, username: str, password: str) -> Optional[Dict[str, Any]]:
+        """Verify credentials and return the user's details, looking the user up once."""
+        import bcrypt
+        
+        with self.scoped_session() as session:
+            user = session.query(User.id, User.username, User.email, User.role, User.password_hash).filter(
+                User.username == username
+            ).first()
+        
+        if user and bcrypt.checkpw(password.encode('utf-8'), user.password_hash.encode('utf-8')):
+            return {
+                'id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'role': user.role
+            }
+        return None
     
     # Job posting operations
     def create_job_posting(self, title: str, description: str, requirements: str = None, created_by: int = None) -> Optional[JobPosting]:
         """Create a new job posting."""
-        session = self.get_session()
         try:
-            job_posting = JobPosting(
-                title=title,
-                description=description,
-                requirements=requirements,
-                created_by=created_by
-            )
-            
-            session.add(job_posting)
-            session.commit()
-            session.refresh(job_posting)
-            return job_posting
-            
+            with self.scoped_session() as session:
+                job_posting = JobPosting(
+                    title=title,
+                    description=description,
+                    requirements=requirements,
+                    created_by=created_by
+                )
+                
+                session.add(job_posting)
+                session.commit()
+                return job_posting
+                
         except Exception as e:
-            session.rollback()
             print(f"Error creating job posting: {str(e)}")
             return None
-        finally:
-            self.close_session(session)
     
     def get_job_postings(self, limit: int = 50) -> List[JobPosting]:
         """Get all job postings."""
-        session = self.get_session()
-        try:
+        with self.scoped_session() as session:
             job_postings = session.query(JobPosting).order_by(JobPosting.created_at.desc()).limit(limit).all()
             return job_postings
-        finally:
-            self.close_session(session)
     
     def get_job_posting_by_id(self, job_id: int) -> Optional[JobPosting]:
         """Get job posting by ID."""
-        session = self.get_session()
-        try:
-            job_posting = session.query(JobPosting).filter(JobPosting.id == job_id).first()
+        job_posting = self._job_posting_cache.get(job_id)
+        if job_posting is not None:
             return job_posting
-        finally:
-            self.close_session(session)
+        
+        with self.scoped_session() as session:
+            job_posting = session.execute(JOB_POSTING_BY_ID, {'job_id': job_id}).scalar_one_or_none()
+        
+        if job_posting is not None:
+            self._job_posting_cache.set(job_id, job_posting)
+        return job_posting
     
     # Screening session operations
     def create_screening_session(self, job_posting_id: int, session_name: str, created_by: int = None) -> Optional[ScreeningSession]:
         """Create a new screening session."""
-        session = self.get_session()
         try:
-            screening_session = ScreeningSession(
-                job_posting_id=job_posting_id,
-                session_name=session_name,
-                created_by=created_by
-            )
-            
-            session.add(screening_session)
-            session.commit()
-            session.refresh(screening_session)
-            return screening_session
-            
+            with self.scoped_session() as session:
+                screening_session = ScreeningSession(
+                    job_posting_id=job_posting_id,
+                    session_name=session_name,
+                    created_by=created_by
+                )
+                
+                session.add(screening_session)
+                session.commit()
+                return screening_session
+                
         except Exception as e:
-            session.rollback()
             print(f"Error creating screening session: {str(e)}")
             return None
-        finally:
-            self.close_session(session)
     
     def get_screening_sessions(self, limit: int = 50) -> List[ScreeningSession]:
         """Get all screening sessions."""
-        session = self.get_session()
-        try:
+        with self.scoped_session() as session:
             sessions = session.query(ScreeningSession).order_by(ScreeningSession.created_at.desc()).limit(limit).all()
             return sessions
-        finally:
-            self.close_session(session)
     
     # Resume analysis operations
     def save_resume_analysis(self, session_id: int, filename: str, similarity_score: float, 
                            skills: List[str], education: List[str], experience: List[str], 
-                           analysis_data: Dict[str, Any]) -> Optional[ResumeAnalysis]:
+                           analysis_data: Dict[str, Any], embedding: Optional[np.ndarray] = None) -> Optional[ResumeAnalysis]:
         """Save resume analysis results."""
-        session = self.get_session()
         try:
-            resume_analysis = ResumeAnalysis(
-                session_id=session_id,
-                filename=filename,
-                similarity_score=similarity_score,
-                skills_extracted=json.dumps(skills),
-                education_extracted=json.dumps(education),
-                experience_extracted=json.dumps(experience),
-                analysis_data=json.dumps(analysis_data)
-            )
+            with self.scoped_session() as session:
+                row, preview = analysis_row(session_id, {
+                    'filename': filename,
+                    'similarity_score': similarity_score,
+                    'skills': skills,
+                    'education': education,
+                    'experience': experience,
+                    'analysis_data': analysis_data,
+                    'embedding': embedding
+                })
+                resume_analysis = ResumeAnalysis(**row)
+                if preview:
+                    resume_analysis.preview = ResumePreview(preview=preview)
+                resume_analysis.skills = [ResumeSkill(skill=skill) for skill in distinct_skills(skills)]
+                
+                session.add(resume_analysis)
+                session.commit()
+                return resume_analysis
+                
+        except Exception as e:
+            print(f"Error saving resume analysis: {str(e)}")
+            return None
+    
+    def save_resume_analyses_bulk(self, session_id: int, analyses: List[Dict[str, Any]]) -> int:
+        """
+        Save many resume analyses in a single transaction.
+        
+        Args:
+            session_id (int): Screening session ID
+            analyses (List[Dict[str, Any]]): Analyses with the keyword
+                arguments of save_resume_analysis other than session_id
             
-            session.add(resume_analysis)
-            session.commit()
-            session.refresh(resume_analysis)
-            return resume_analysis
+        Returns:
+            int: Number of analyses saved
+        """
+        if not analyses:
+            return 0
+        
+        try:
+            with self.scoped_session() as session:
+                saved = self._insert_analyses(session, session_id, analyses)
+                session.commit()
+                return saved
+                
+        except Exception as e:
+            print(f"Error saving resume analyses: {str(e)}")
+            return 0
+    
+    def save_screening_batch(self, job_posting_id: int, session_name: str, analyses: List[Dict[str, Any]],
+                             created_by: int = None) -> Optional[ScreeningSession]:
+        """
+        Create a screening session and save its resume analyses in one transaction.
+        
+        Args:
+            job_posting_id (int): Job posting the resumes were screened against
+            session_name (str): Name of the screening session
+            analyses (List[Dict[str, Any]]): Analyses with the keyword
+                arguments of save_resume_analysis other than session_id
+            created_by (int): ID of the user running the screening
             
+        Returns:
+            Optional[ScreeningSession]: The new session, or None if nothing was saved
+        """
+        try:
+            with self.scoped_session() as session:
+                screening_session = ScreeningSession(
+                    job_posting_id=job_posting_id,
+                    session_name=session_name,
+                    created_by=created_by
+                )
+                session.add(screening_session)
+                session.flush()
+                
+                if analyses:
+                    self._insert_analyses(session, screening_session.id, analyses)
+                
+                session.commit()
+                return screening_session
+                
         except Exception as e:
-            session.rollback()
-            print(f"Error saving resume analysis: {str(e)}")
+            print(f"Error saving screening session: {str(e)}")
             return None
-        finally:
-            self.close_session(session)
+    
+    def _insert_analyses(self, session, session_id: int, analyses: List[Dict[str, Any]]) -> int:
+        """Insert analyses with their previews and skills without committing."""
+        rows, previews = zip(*(analysis_row(session_id, analysis) for analysis in analyses))
+        rows = list(rows)
+        
+        if self.engine.dialect.insert_executemany_returning_sort_by_parameter_order:
+            analysis_ids = session.execute(
+                insert(ResumeAnalysis).returning(ResumeAnalysis.id, sort_by_parameter_order=True), rows
+            ).scalars().all()
+        else:
+            # SQLite before 3.35 has no RETURNING; insert row by row in the same transaction
+            analysis_ids = [
+                session.execute(insert(ResumeAnalysis), row).inserted_primary_key[0] for row in rows
+            ]
+        
+        preview_rows = [
+            {'analysis_id': analysis_id, 'preview': preview}
+            for analysis_id, preview in zip(analysis_ids, previews) if preview
+        ]
+        if preview_rows:
+            session.execute(insert(ResumePreview), preview_rows)
+        
+        skills = [
+            skill_row
+            for analysis_id, analysis in zip(analysis_ids, analyses)
+            for skill_row in skill_rows(analysis_id, analysis['skills'])
+        ]
+        if skills:
+            session.execute(insert(ResumeSkill), skills)
+        
+        return len(rows)
+    
+    def get_resume_preview(self, analysis_id: int) -> Optional[str]:
+        """Get the resume text preview of an analysis."""
+        with self.scoped_session() as session:
+            return session.query(ResumePreview.preview).filter(ResumePreview.analysis_id == analysis_id).scalar()
     
     def get_resume_analyses_by_session(self, session_id: int) -> List[ResumeAnalysis]:
         """Get all resume analyses for a session."""
-        session = self.get_session()
-        try:
-            analyses = session.query(ResumeAnalysis).filter(
-                ResumeAnalysis.session_id == session_id
-            ).order_by(ResumeAnalysis.similarity_score.desc()).all()
-            return analyses
-        finally:
-            self.close_session(session)
+        return list(self.iter_resume_analyses_by_session(session_id))
+    
+    def iter_resume_analyses_by_session(self, session_id: int, batch_size: int = 500) -> Iterator[ResumeAnalysis]:
+        """
+        Stream the resume analyses of a session, best matches first.
+        
+        Args:
+            session_id (int): Screening session ID
+            batch_size (int): Number of rows fetched from the database at a time
+            
+        Yields:
+            ResumeAnalysis: Analyses in descending similarity order
+        """
+        with self.scoped_session() as session:
+            yield from session.scalars(
+                ANALYSES_BY_SESSION, {'session_id': session_id}, execution_options={'yield_per': batch_size}
+            )
+    
+    def get_analyses_by_skill(self, skill: str, session_id: Optional[int] = None) -> List[ResumeAnalysis]:
+        """
+        Get resume analyses that mention a skill, best matches first.
+        
+        Args:
+            skill (str): Skill to look for, matched case-insensitively
+            session_id (Optional[int]): Only search this screening session
+            
+        Returns:
+            List[ResumeAnalysis]: Matching analyses
+        """
+        with self.scoped_session() as session:
+            query = session.query(ResumeAnalysis).join(ResumeSkill).filter(ResumeSkill.skill == skill.strip().lower())
+            if session_id is not None:
+                query = query.filter(ResumeAnalysis.session_id == session_id)
+            return query.order_by(ResumeAnalysis.similarity_score.desc()).all()
+    
+    def get_analysis_counts_by_session(self) -> Dict[int, int]:
+        """Get the number of resume analyses per screening session."""
+        with self.scoped_session() as session:
+            rows = session.query(ResumeAnalysis.session_id, func.count(ResumeAnalysis.id)).group_by(
+                ResumeAnalysis.session_id
+            ).all()
+            return {session_id: count for session_id, count in rows}
+    
+    def get_session_score_stats(self, session_ids: List[int]) -> Dict[int, Tuple[float, int]]:
+        """Get the average similarity score and analysis count for each session."""
+        with self.scoped_session() as session:
+            rows = session.query(
+                ResumeAnalysis.session_id,
+                func.avg(ResumeAnalysis.similarity_score),
+                func.count(ResumeAnalysis.id)
+            ).filter(ResumeAnalysis.session_id.in_(session_ids)).group_by(ResumeAnalysis.session_id).all()
+            return {session_id: (float(avg_score or 0), count) for session_id, avg_score, count in rows}
+    
+    def get_resume_embeddings_by_session(self, session_id: int) -> Dict[int, np.ndarray]:
+        """Get stored resume embeddings for a session keyed by analysis ID."""
+        with self.scoped_session() as session:
+            rows = session.query(ResumeAnalysis.id, ResumeAnalysis.embedding).filter(
+                ResumeAnalysis.session_id == session_id,
+                ResumeAnalysis.embedding.isnot(None)
+            ).all()
+            return {analysis_id: decode_embedding(blob) for analysis_id, blob in rows}
     
     def get_analysis_statistics(self) -> Dict[str, Any]:
         """Get overall analysis statistics."""
-        session = self.get_session()
-        try:
-            total_analyses = session.query(ResumeAnalysis).count()
-            total_sessions = session.query(ScreeningSession).count()
-            total_jobs = session.query(JobPosting).count()
-            total_users = session.query(User).count()
-            
-            # Average similarity score
-            avg_score = session.query(ResumeAnalysis.similarity_score).all()
-            avg_similarity = sum([score[0] for score in avg_score if score[0]]) / len(avg_score) if avg_score else 0
+        with self.scoped_session() as session:
+            # All counts and the average score in a single round-trip
+            total_analyses, avg_similarity, total_sessions, total_jobs, total_users = session.query(
+                func.count(ResumeAnalysis.id),
+                func.avg(ResumeAnalysis.similarity_score),
+                select(func.count(ScreeningSession.id)).scalar_subquery(),
+                select(func.count(JobPosting.id)).scalar_subquery(),
+                select(func.count(User.id)).scalar_subquery()
+            ).select_from(ResumeAnalysis).one()
             
             return {
                 'total_analyses': total_analyses,
                 'total_sessions': total_sessions,
                 'total_jobs': total_jobs,
                 'total_users': total_users,
-                'average_similarity': avg_similarity
+                'average_similarity': float(avg_similarity or 0)
             }
-        finally:
-            self.close_session(session)
+
+    # Embedding cache operations
+    def get_cached_embeddings(self, content_hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Get cached embeddings by content hash."""
+        try:
+            with self.scoped_session() as session:
+                embeddings = {}
+                for start in range(0, len(content_hashes), EMBEDDING_LOOKUP_CHUNK):
+                    chunk = content_hashes[start:start + EMBEDDING_LOOKUP_CHUNK]
+                    rows = session.query(EmbeddingCacheEntry.content_hash, EmbeddingCacheEntry.embedding).filter(
+                        EmbeddingCacheEntry.content_hash.in_(chunk)
+                    ).all()
+                    for content_hash, blob in rows:
+                        embeddings[content_hash] = decode_embedding(blob)
+                return embeddings
+        except Exception as e:
+            print(f"Error loading cached embeddings: {str(e)}")
+            return {}
+    
+    def put_cached_embeddings(self, embeddings: Dict[str, np.ndarray]):
+        """Store embeddings as float16 keyed by content hash."""
+        if not embeddings:
+            return
+        
+        try:
+            with self.scoped_session() as session:
+                session.add_all([
+                    EmbeddingCacheEntry(
+                        content_hash=content_hash,
+                        embedding=encode_embedding(embedding)
+                    )
+                    for content_hash, embedding in embeddings.items()
+                ])
+                session.commit()
+                
+        except Exception as e:
+            # Entries may already have been cached by a concurrent screening
+            print(f"Error caching embeddings: {str(e)}")
+
+class DatabaseEmbeddingCache:
+    """Embedding cache for JobMatcher backed by the embedding_cache table."""
+    
+    def __init__(self, manager: DatabaseManager):
+        """Initialize the cache on top of a database manager."""
+        self.manager = manager
+    
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Load cached embeddings."""
+        return self.manager.get_cached_embeddings(keys)
+    
+    def put_many(self, embeddings: Dict[str, np.ndarray]):
+        """Store embeddings in the cache."""
+        self.manager.put_cached_embeddings(embeddings)
 
 # Global database manager instance
 db_manager = DatabaseManager()
@@ -290,9 +878,8 @@ def init_database():
         print("✅ Database initialized successfully")
         
         # Create default admin user if no users exist
-        session = db_manager.get_session()
-        user_count = session.query(User).count()
-        db_manager.close_session(session)
+        with db_manager.scoped_session() as session:
+            user_count = session.query(User).count()
         
         if user_count == 0:
             admin_user = db_manager.create_user(
@@ -0,0 +1,99 @@
+"""
+Embedding cache for SmartHire.AI
+Persists S-BERT embeddings on disk keyed by a hash of the encoded text
+"""
+
+import os
+import hashlib
+from typing import Dict, List
+import numpy as np
+
+def content_key(model_name: str, text: str) -> str:
+    """
+    Build the cache key for a text embedded with a given model.
+
+    Args:
+        model_name (str): Name of the sentence transformer model
+        text (str): Text that is passed to the encoder
+
+    Returns:
+        str: Hex digest identifying the embedding
+    """
+    return hashlib.sha256(f"{model_name}\0{text}".encode('utf-8')).hexdigest()
+
+class EmbeddingCache:
+    """On-disk cache storing one .npy file per embedding."""
+
+    def __init__(self, cache_dir: str = "embeddings_cache", max_entries: int = 10000):
+        """
+        Initialize the embedding cache.
+
+        Args:
+            cache_dir (str): Directory holding the cached embeddings
+            max_entries (int): Number of embeddings kept before the least
+                recently used ones are evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        """Get the file path for a cache key."""
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Load cached embeddings.
+
+        Args:
+            keys (List[str]): Cache keys to look up
+
+        Returns:
+            Dict[str, np.ndarray]: Embeddings found in the cache
+        """
+        found = {}
+        for key in keys:
+            path = self._path(key)
+            try:
+                found[key] = np.load(path)
+                # Touch the file so eviction keeps recently used entries
+                os.utime(path)
+            except (OSError, ValueError):
+                continue
+        return found
+
+    def put_many(self, embeddings: Dict[str, np.ndarray]):
+        """
+        Store embeddings in the cache.
+
+        Args:
+            embeddings (Dict[str, np.ndarray]): Embeddings by cache key
+        """
+        for key, embedding in embeddings.items():
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    np.save(f, np.asarray(embedding, dtype=np.float32))
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Error caching embedding: {str(e)}")
+
+        if embeddings:
+            self._evict()
+
+    def _evict(self):
+        """Remove the least recently used embeddings above max_entries."""
+        try:
+            with os.scandir(self.cache_dir) as it:
+                entries = [entry for entry in it if entry.name.endswith(".npy")]
+
+            excess = len(entries) - self.max_entries
+            if excess <= 0:
+                return
+
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:excess]:
+                os.remove(entry.path)
+        except OSError as e:
+            print(f"Error evicting cached embeddings: {str(e)}")
@@ -6,17 +6,34 @@ Run this script to install all dependencies and set up the project
 import subprocess
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Oldest pip that resolves requirements.txt reliably; newer versions are not upgraded
+MIN_PIP_VERSION = (21, 3)
+
+NLTK_PACKAGES = ['punkt', 'stopwords', 'wordnet']
+
+def _pip_version():
+    """Get the installed pip version as a tuple of ints."""
+    try:
+        import pip
+        return tuple(int(part) for part in pip.__version__.split('.')[:2] if part.isdigit())
+    except ImportError:
+        return ()
 
 def install_requirements():
     """Install all required packages."""
     print("🚀 Installing SmartHire.AI dependencies...")
     
     try:
-        # Upgrade pip first
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "--upgrade", "pip"])
+        # Upgrade pip only if it is too old
+        if _pip_version() < MIN_PIP_VERSION:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", "--upgrade", "pip"])
         
-        # Install requirements
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        # Install requirements, preferring wheels over source builds
+        subprocess.check_call([
+            sys.executable, "-m", "pip", "install", "--prefer-binary", "--no-input", "-r", "requirements.txt"
+        ])
         
         print("✅ All packages installed successfully!")
         return True
@@ -30,16 +47,23 @@ def download_models():
     print("📥 Downloading required models...")
     
     try:
-        # Download spaCy model
-        subprocess.check_call([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
-        print("✅ spaCy model downloaded!")
-        
-        # Download NLTK data
         import nltk
-        nltk.download('punkt', quiet=True)
-        nltk.download('stopwords', quiet=True)
-        nltk.download('wordnet', quiet=True)
-        print("✅ NLTK data downloaded!")
+        
+        # Fetch the spaCy model and NLTK data concurrently; NLTK's shared
+        # downloader is not thread-safe, so all its packages go in one call
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            spacy_future = executor.submit(
+                subprocess.check_call, [sys.executable, "-m", "spacy", "download", "en_core_web_sm"]
+            )
+            nltk_future = executor.submit(nltk.download, NLTK_PACKAGES, quiet=True)
+            
+            spacy_future.result()
+            print("✅ spaCy model downloaded!")
+            
+            if nltk_future.result():
+                print("✅ NLTK data downloaded!")
+            else:
+                print("⚠️ Some NLTK data could not be downloaded.")
         
         return True
         
@@ -48,6 +72,16 @@ def download_models():
         print("You can continue, but some features may be limited.")
         return True
 
+def _mount_hints():
+    """Print filesystem tuning hints for the SQLite database on Linux."""
+    if not sys.platform.startswith("linux"):
+        return
+    
+    data_dir = os.path.abspath("data")
+    print("\n💡 Optional: avoid access-time writes on the SQLite database:")
+    print(f"   sudo mount -o remount,noatime $(df --output=target {data_dir} | tail -1)")
+    print("   For throwaway runs: DATABASE_URL=sqlite:////dev/shm/smarthire.db")
+
 def main():
     """Main installation function."""
     print("=" * 60)
@@ -63,6 +97,7 @@ def main():
         print("\nNext steps:")
         print("1. Run: python setup.py (for complete setup)")
         print("2. Or run: streamlit run app.py (to start immediately)")
+        _mount_hints()
         print("=" * 60)
     else:
         print("\n❌ Installation failed. Please check the errors above.")
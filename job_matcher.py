@@ -1,30 +1,315 @@
+import atexit
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 import spacy
+from embedding_cache import EmbeddingCache, content_key
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Batch size for S-BERT encoding. sentence-transformers sorts the inputs of a
+# single encode() call by length before batching, so each mini-batch holds
+# similar-length texts and padding is kept to a minimum.
+ENCODE_BATCH_SIZE = 32
+
+# Directory holding locally exported ONNX models
+ONNX_MODEL_DIR = "onnx_models"
+
+# Rough upper bound of characters per token. Texts are cut to
+# max_seq_length * CHARS_PER_TOKEN characters before encoding; S-BERT drops
+# everything past max_seq_length tokens anyway, so the tokenizer is spared
+# the tail of long resumes without changing the embedding.
+CHARS_PER_TOKEN = 8
+
+# Smallest number of texts encoded with the multi-process pool; smaller
+# batches do not make up for the cost of shipping texts to the workers
+MULTI_PROCESS_MIN_TEXTS = 32
+
+# Smallest number of resumes scored on the GPU when the model runs on CUDA
+GPU_SCORING_MIN_ROWS = 1000
+
+# Number of texts whose preprocessing, keyword scans and embeddings are kept in
+# memory; explanations and weighted scores process the same texts repeatedly
+TEXT_CACHE_SIZE = 1024
+
+def cosine_scores(matrix: np.ndarray, vector: np.ndarray, device: Optional[str] = None) -> np.ndarray:
+    """
+    Calculate the cosine similarity of every row of a matrix with a vector.
+    
+    Large matrices are scored with torch.mv when a CUDA device is given.
+    Otherwise SimSIMD's SIMD kernels are used when it is installed, or a
+    float32 BLAS matrix-vector product, which equals cosine similarity for
+    the unit-norm embeddings produced by encode_texts.
+    
+    Args:
+        matrix (np.ndarray): Contiguous float32 matrix with one embedding per row
+        vector (np.ndarray): Contiguous float32 embedding
+        device (Optional[str]): Torch device of the model
+        
+    Returns:
+        np.ndarray: Similarity per row
+    """
+    if device is not None and device.startswith('cuda') and len(matrix) >= GPU_SCORING_MIN_ROWS:
+        with torch.inference_mode():
+            scores = torch.mv(torch.from_numpy(matrix).to(device), torch.from_numpy(vector).to(device))
+        return scores.cpu().numpy()
+    if simsimd is not None:
+        distances = simsimd.cdist(matrix, vector.reshape(1, -1), metric='cosine')
+        return 1.0 - np.asarray(distances, dtype=np.float32).ravel()
+    return matrix @ vector
+
+@lru_cache(maxsize=4)
+def _get_st_model(model_name: str, device: str) -> SentenceTransformer:
+    """
+    Load a sentence transformer once per process and warm it up.
+    
+    The warmup encode creates the CUDA context and runs kernel selection
+    here, so the first real request does not pay for it.
+    
+    Args:
+        model_name (str): Name of the sentence transformer model
+        device (str): Torch device
+        
+    Returns:
+        SentenceTransformer: Shared model
+    """
+    model = SentenceTransformer(model_name, device=device)
+    with torch.inference_mode():
+        model.encode(["warmup"], show_progress_bar=False)
+    return model
+
+@lru_cache(maxsize=1)
+def _get_spacy():
+    """Load the spaCy pipeline once per process, or None if it is not installed."""
+    # Key phrases need the parser (noun chunks) and NER but not lemmas
+    try:
+        return spacy.load("en_core_web_sm", disable=["lemmatizer"])
+    except OSError:
+        return None
+
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count
+else:
+    def popcount(value: int) -> int:
+        """Count the set bits of an int (int.bit_count before Python 3.10)."""
+        return bin(value).count('1')
+
+def build_keyword_automaton(categories: Dict[str, List[str]]):
+    """
+    Build an Aho-Corasick automaton matching the keywords of all categories.
+    
+    Args:
+        categories (Dict[str, List[str]]): Keywords by category
+        
+    Returns:
+        Automaton whose values are (keyword, categories) tuples, or None if
+        pyahocorasick is not installed
+    """
+    if ahocorasick is None:
+        return None
+    
+    keyword_categories = {}
+    for category, keywords in categories.items():
+        for keyword in keywords:
+            keyword_categories.setdefault(keyword, []).append(category)
+    
+    automaton = ahocorasick.Automaton()
+    for keyword, keyword_cats in keyword_categories.items():
+        automaton.add_word(keyword, (keyword, tuple(keyword_cats)))
+    automaton.make_automaton()
+    return automaton
+
+class TextFeatures(NamedTuple):
+    """Keyword features of a text shared by the weighted similarity sub-scores."""
+    skill_mask: int
+    experience: frozenset
+    education: frozenset
+
+class RankedResumes:
+    """
+    Resumes ranked by similarity, kept as columns instead of one dict per resume.
+    
+    Filenames and scores are arrays in rank order, and the skill bitmasks
+    are computed for the whole batch on first access. Result dicts,
+    including the weighted scores, are only built for the resumes that are
+    read and are kept once built, so showing the top few of a large batch
+    does not score every resume and reading the results again costs nothing.
+    Iterating, indexing, slicing and len() work as on the list rank_resumes
+    used to return.
+    """
+    
+    def __init__(self, matcher: 'JobMatcher', job_description: str, filenames: List[str],
+                 texts: List[str], scores: np.ndarray):
+        """
+        Rank resumes by their similarity scores.
+        
+        Args:
+            matcher (JobMatcher): Matcher used for the weighted scores
+            job_description (str): Job description text
+            filenames (List[str]): Resume filenames
+            texts (List[str]): Resume texts
+            scores (np.ndarray): Similarity score of each resume
+        """
+        # Stable descending sort, so equal scores keep their input order
+        self.order = np.argsort(-np.asarray(scores, dtype=np.float32), kind='stable')
+        self.scores = np.asarray(scores, dtype=np.float32)[self.order]
+        self.filenames = np.asarray(filenames, dtype=object)[self.order]
+        self._texts = texts
+        self._matcher = matcher
+        self._job_description = job_description
+        self._rows = {}
+        self._skill_masks = None
+    
+    @property
+    def skill_masks(self) -> np.ndarray:
+        """
+        Skill bitmask of each resume in rank order.
+        
+        The masks are Python ints in an object array, because the skill
+        vocabulary grows past 64 bits as new skills are seen.
+        """
+        if self._skill_masks is None:
+            self._skill_masks = np.array(
+                [self._matcher._analyze(self._texts[index]).skill_mask for index in self.order],
+                dtype=object
+            )
+        return self._skill_masks
+    
+    def __len__(self) -> int:
+        return len(self.order)
+    
+    def __getitem__(self, rank):
+        """Get the result dict of the resume at a rank, or a list of them for a slice."""
+        if isinstance(rank, slice):
+            return [self[i] for i in range(*rank.indices(len(self)))]
+        
+        rank = int(rank)
+        if rank < 0:
+            rank += len(self)
+        if not 0 <= rank < len(self):
+            raise IndexError("rank out of range")
+        
+        row = self._rows.get(rank)
+        if row is None:
+            text = self._texts[self.order[rank]]
+            similarity_score = float(self.scores[rank])
+            row = {
+                'filename': self.filenames[rank],
+                'similarity_score': similarity_score,
+                'weighted_scores': self._matcher.calculate_weighted_similarity(
+                    self._job_description, text, overall_similarity=similarity_score
+                ),
+                'text': text
+            }
+            self._rows[rank] = row
+        return row
+    
+    def __iter__(self) -> Iterator[Dict]:
+        return self.iter_top(len(self))
+    
+    def iter_top(self, k: int) -> Iterator[Dict]:
+        """
+        Yield the result dicts of the k best matching resumes.
+        
+        Args:
+            k (int): Number of resumes
+            
+        Yields:
+            Dict: Filename, similarity score, weighted scores and text
+        """
+        for rank in range(min(k, len(self))):
+            yield self[rank]
 
 class JobMatcher:
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', embedding_cache: Optional[EmbeddingCache] = None,
+                 backend: str = 'torch', onnx_quantization: str = 'avx2', device: Optional[str] = None,
+                 compile_model: bool = False, quantize: bool = False, encode_processes: int = 0):
         """
         Initialize the job matcher with S-BERT model.
         
         Args:
             model_name (str): Name of the sentence transformer model
+            embedding_cache (Optional[EmbeddingCache]): Cache used to reuse
+                embeddings of previously encoded texts
+            backend (str): 'torch' for the PyTorch model or 'onnx' for an
+                ONNX Runtime model on CPU
+            onnx_quantization (str): Quantization config used when exporting
+                the ONNX model ('avx2', 'avx512', 'avx512_vnni' or 'arm64'),
+                or 'none' for a float32 model with O3 graph optimizations
+            device (Optional[str]): Torch device for the 'torch' backend;
+                defaults to CUDA when available, otherwise CPU
+            compile_model (bool): Compile the transformer with torch.compile
+                ('torch' backend only)
+            quantize (bool): Run the transformer in float16 on GPU or with
+                int8 dynamic quantization on CPU ('torch' backend only)
+            encode_processes (int): Number of CPU worker processes used to
+                encode large batches; 0 or 1 encodes in this process
+                ('torch' backend on CPU without compile_model only)
         """
+        self.model_name = model_name
+        self.embedding_cache = embedding_cache
+        self.backend = backend
+        
+        # Quantized and optimized embeddings differ slightly, so they get
+        # their own cache keys
+        optimize_onnx = not onnx_quantization or onnx_quantization.lower() == 'none'
+        if backend == 'onnx' and optimize_onnx:
+            self.embedding_id = f"{model_name}:onnx-O3"
+        elif backend == 'onnx':
+            self.embedding_id = f"{model_name}:onnx-qint8-{onnx_quantization}"
+        else:
+            self.embedding_id = model_name
+        
         try:
-            self.model = SentenceTransformer(model_name)
-            print(f"✅ Loaded S-BERT model: {model_name}")
+            if backend == 'onnx':
+                self.device = 'cpu'
+                if optimize_onnx:
+                    self.model = self._load_optimized_onnx_model(model_name)
+                else:
+                    self.model = self._load_quantized_onnx_model(model_name, onnx_quantization)
+            else:
+                self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
+                if quantize or compile_model:
+                    # Both modify the model in place, so it gets its own copy
+                    self.model = SentenceTransformer(model_name, device=self.device)
+                else:
+                    self.model = _get_st_model(model_name, self.device)
+            print(f"✅ Loaded S-BERT model: {model_name} ({backend}, {self.device})")
         except Exception as e:
             print(f"❌ Error loading S-BERT model: {str(e)}")
             raise
         
+        if quantize and backend == 'torch':
+            self._quantize_model()
+        
+        if compile_model and backend == 'torch':
+            self._compile_model()
+        
+        # Compiled models cannot be shipped to worker processes
+        multi_process = backend == 'torch' and self.device == 'cpu' and not compile_model
+        self.encode_processes = encode_processes if multi_process else 0
+        self._encode_pool = None
+        self._encode_pool_lock = threading.Lock()
+        
+        self.max_text_chars = (self.model.max_seq_length or 512) * CHARS_PER_TOKEN
+        
         # Load spaCy model for text processing
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            self.nlp = None
+        self.nlp = _get_spacy()
+        if self.nlp is None:
             print("Warning: spaCy model not found. Some features may be limited.")
         
         # Define important keywords for different categories
@@ -44,6 +329,148 @@ class JobMatcher:
             'degree', 'bachelor', 'master', 'phd', 'university', 'college',
             'engineering', 'computer science', 'information technology'
         ]
+        
+        # One automaton finds the keywords of every category in a single pass
+        self._keyword_categories = {
+            'skills': self.skill_keywords,
+            'experience': self.experience_keywords,
+            'education': self.education_keywords
+        }
+        self._keyword_automaton = build_keyword_automaton(self._keyword_categories)
+        
+        # Per-instance memoization of text processing
+        self.preprocess_text = lru_cache(maxsize=TEXT_CACHE_SIZE)(self.preprocess_text)
+        self._scan_keywords = lru_cache(maxsize=TEXT_CACHE_SIZE)(self._scan_keywords)
+        self._extract_skills_from_text = lru_cache(maxsize=TEXT_CACHE_SIZE)(self._extract_skills_from_text)
+        self._skill_mask = lru_cache(maxsize=TEXT_CACHE_SIZE)(self._skill_mask)
+        self._analyze = lru_cache(maxsize=TEXT_CACHE_SIZE)(self._analyze)
+        
+        # Bit position of every skill seen so far, for skill-set bitmasks;
+        # pattern matches outside skill_keywords are added on first sight
+        self._skill_bits = {skill: bit for bit, skill in enumerate(self.skill_keywords)}
+        self._skill_bits_lock = threading.Lock()
+        self._embedding_memo = OrderedDict()
+        self._embedding_memo_lock = threading.Lock()
+        
+        # Additional skill patterns, compiled once instead of on every extraction
+        self._skill_res = [re.compile(pattern, re.IGNORECASE) for pattern in (
+            r'\b(?:python|java|javascript|c\+\+|c#|php|ruby|go|rust|swift|kotlin)\b',
+            r'\b(?:react|angular|vue|node\.?js|django|flask|spring|laravel)\b',
+            r'\b(?:mysql|postgresql|mongodb|redis|elasticsearch|oracle)\b',
+            r'\b(?:aws|azure|gcp|docker|kubernetes|jenkins|git|github)\b'
+        )]
+        self._exp_re = re.compile(r'(\d+)\s*(?:\+)?\s*years?\s+(?:of\s+)?experience', re.IGNORECASE)
+        
+        # preprocess_text collapses whitespace runs and blanks special
+        # characters in one pass, then normalizes variations in a second one
+        self._scrub_re = re.compile(r'\s+|[^\w\s\.\+\#\-]')
+        self._replacements = {
+            'c++': 'cpp',
+            'c#': 'csharp',
+            '.net': 'dotnet',
+            'node.js': 'nodejs',
+            'react.js': 'react',
+            'vue.js': 'vue'
+        }
+        self._replacements_re = re.compile('|'.join(map(re.escape, self._replacements)))
+    
+    def _load_quantized_onnx_model(self, model_name: str, quantization: str) -> SentenceTransformer:
+        """
+        Load an int8 dynamically quantized ONNX Runtime version of the model.
+        
+        The model is exported and quantized on first use and saved under
+        ONNX_MODEL_DIR, so later loads skip the conversion.
+        
+        Args:
+            model_name (str): Name of the sentence transformer model
+            quantization (str): Quantization config name
+            
+        Returns:
+            SentenceTransformer: Model running on ONNX Runtime
+        """
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        
+        model_dir = os.path.join(ONNX_MODEL_DIR, model_name.replace('/', '_'))
+        file_suffix = f"qint8_{quantization}"
+        file_name = f"onnx/model_{file_suffix}.onnx"
+        model_kwargs = {'file_name': file_name, 'provider': 'CPUExecutionProvider'}
+        
+        if not os.path.exists(os.path.join(model_dir, file_name)):
+            print(f"Exporting quantized ONNX model to {model_dir}...")
+            model = SentenceTransformer(model_name, backend='onnx', device='cpu')
+            model.save(model_dir)
+            export_dynamic_quantized_onnx_model(model, quantization, model_dir, file_suffix=file_suffix)
+        
+        return SentenceTransformer(model_dir, backend='onnx', device='cpu', model_kwargs=model_kwargs)
+    
+    def _load_optimized_onnx_model(self, model_name: str) -> SentenceTransformer:
+        """
+        Load a float32 ONNX Runtime version of the model with O3 graph optimizations.
+        
+        O3 fuses attention, layer norm and GELU into single kernels. The
+        model is exported and optimized on first use and saved under
+        ONNX_MODEL_DIR, so later loads skip the conversion.
+        
+        Args:
+            model_name (str): Name of the sentence transformer model
+            
+        Returns:
+            SentenceTransformer: Model running on ONNX Runtime
+        """
+        from sentence_transformers import export_optimized_onnx_model
+        
+        model_dir = os.path.join(ONNX_MODEL_DIR, model_name.replace('/', '_'))
+        file_name = "onnx/model_O3.onnx"
+        model_kwargs = {'file_name': file_name, 'provider': 'CPUExecutionProvider'}
+        
+        if not os.path.exists(os.path.join(model_dir, file_name)):
+            print(f"Exporting optimized ONNX model to {model_dir}...")
+            model = SentenceTransformer(model_name, backend='onnx', device='cpu')
+            model.save(model_dir)
+            export_optimized_onnx_model(model, "O3", model_dir)
+        
+        return SentenceTransformer(model_dir, backend='onnx', device='cpu', model_kwargs=model_kwargs)
+    
+    def _quantize_model(self):
+        """
+        Reduce the precision of the torch model for faster encoding.
+        
+        On GPU the model is cast to float16. On CPU the Linear layers of the
+        transformer are replaced by int8 dynamically quantized ones. Either
+        way the embeddings drift slightly, so they get their own cache keys.
+        """
+        try:
+            if self.device.startswith('cuda'):
+                self.model.half()
+                self.embedding_id = f"{self.model_name}:fp16"
+            else:
+                transformer = self.model[0]
+                transformer.auto_model = torch.quantization.quantize_dynamic(
+                    transformer.auto_model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                self.embedding_id = f"{self.model_name}:qint8-dynamic"
+            print(f"✅ Quantized S-BERT model ({self.embedding_id})")
+        except Exception as e:
+            print(f"Warning: quantization failed, using float32 model: {str(e)}")
+    
+    def _compile_model(self):
+        """
+        Compile the underlying transformer with torch.compile and warm it up.
+        
+        Compilation happens lazily on the first forward pass, so a dummy
+        encode is run here instead of on the first real request. Falls back
+        to the eager model if torch.compile is unavailable or fails.
+        """
+        transformer = self.model[0]
+        eager_model = transformer.auto_model
+        try:
+            transformer.auto_model = torch.compile(eager_model, mode="reduce-overhead", dynamic=True)
+            with torch.inference_mode():
+                self.model.encode(["warmup"], show_progress_bar=False)
+            print("✅ Compiled S-BERT model with torch.compile")
+        except Exception as e:
+            transformer.auto_model = eager_model
+            print(f"Warning: torch.compile failed, using eager model: {str(e)}")
     
     def preprocess_text(self, text: str) -> str:
         """
@@ -58,24 +485,11 @@ class JobMatcher:
         # Convert to lowercase
         text = text.lower()
         
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove special characters but keep important ones
-        text = re.sub(r'[^\w\s\.\+\#\-]', ' ', text)
+        # Remove extra whitespace and special characters but keep important ones
+        text = self._scrub_re.sub(' ', text)
         
         # Normalize common variations
-        replacements = {
-            'c++': 'cpp',
-            'c#': 'csharp',
-            '.net': 'dotnet',
-            'node.js': 'nodejs',
-            'react.js': 'react',
-            'vue.js': 'vue'
-        }
-        
-        for old, new in replacements.items():
-            text = text.replace(old, new)
+        text = self._replacements_re.sub(lambda match: self._replacements[match.group(0)], text)
         
         return text.strip()
     
@@ -92,7 +506,10 @@ class JobMatcher:
         if not self.nlp:
             return []
         
-        doc = self.nlp(text)
+        return self._key_phrases_from_doc(self.nlp(text))
+    
+    def _key_phrases_from_doc(self, doc) -> List[str]:
+        """Collect short noun phrases and relevant entities of a spaCy Doc."""
         key_phrases = []
         
         # Extract noun phrases
@@ -123,13 +540,13 @@ class JobMatcher:
             job_desc_clean = self.preprocess_text(job_description)
             resume_clean = self.preprocess_text(resume_text)
             
-            # Generate embeddings using S-BERT
-            job_embedding = self.model.encode([job_desc_clean])
-            resume_embedding = self.model.encode([resume_clean])
+            # Generate both normalized embeddings in one S-BERT call
+            job_embedding, resume_embedding = self.encode_texts(
+                [job_desc_clean[:self.max_text_chars], resume_clean[:self.max_text_chars]]
+            )
             
-            # Calculate cosine similarity
-            similarity_matrix = cosine_similarity(job_embedding, resume_embedding)
-            similarity_score = similarity_matrix[0][0]
+            # Cosine similarity of unit vectors is their dot product
+            similarity_score = float(np.dot(job_embedding, resume_embedding))
             
             # Ensure score is between 0 and 1
             similarity_score = max(0.0, min(1.0, similarity_score))
@@ -140,29 +557,199 @@ class JobMatcher:
             print(f"Error calculating similarity: {str(e)}")
             return 0.0
     
-    def calculate_weighted_similarity(self, job_description: str, resume_text: str) -> Dict[str, float]:
+    def encode_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts into L2-normalized S-BERT embeddings.
+        
+        Embeddings of recently encoded texts are kept in memory, and those
+        found in the embedding cache are reused; the remaining texts are
+        encoded in a single batched call and added to the cache.
+        That call length-sorts the texts before batching and restores the
+        input order afterwards, so no explicit reordering is done here.
+        Identical texts (e.g. the same resume uploaded twice) share one key
+        and are encoded only once.
+        
+        Args:
+            texts (List[str]): Texts to encode
+            
+        Returns:
+            np.ndarray: Embedding matrix with one row per text
+        """
+        keys = [content_key(self.embedding_id, text) for text in texts]
+        cached = self._recall_embeddings(keys)
+        if self.embedding_cache and len(cached) < len(keys):
+            cached.update(self.embedding_cache.get_many([key for key in keys if key not in cached]))
+        
+        # First index of every distinct uncached text, in input order
+        missing = {}
+        for i, key in enumerate(keys):
+            if key not in cached and key not in missing:
+                missing[key] = i
+        
+        if missing:
+            missing_texts = [texts[i] for i in missing.values()]
+            
+            # Normalized embeddings reduce cosine similarity to a dot product
+            if self.encode_processes > 1 and len(missing_texts) > MULTI_PROCESS_MIN_TEXTS:
+                encoded = self.model.encode_multi_process(
+                    missing_texts,
+                    self._get_encode_pool(),
+                    batch_size=ENCODE_BATCH_SIZE,
+                    normalize_embeddings=True
+                )
+            else:
+                with torch.inference_mode():
+                    encoded = self.model.encode(
+                        missing_texts,
+                        batch_size=ENCODE_BATCH_SIZE,
+                        show_progress_bar=False,
+                        convert_to_numpy=True,
+                        normalize_embeddings=True
+                    )
+            new_embeddings = dict(zip(missing, encoded))
+            if self.embedding_cache:
+                self.embedding_cache.put_many(new_embeddings)
+            cached.update(new_embeddings)
+        
+        self._remember_embeddings({key: cached[key] for key in keys})
+        return np.vstack([cached[key] for key in keys]).astype(np.float32, copy=False)
+    
+    def _get_encode_pool(self):
+        """
+        Start the multi-process encoding pool on first use.
+        
+        Each worker gets an equal share of the CPU cores through
+        OMP_NUM_THREADS, so the workers do not oversubscribe the machine.
+        """
+        with self._encode_pool_lock:
+            if self._encode_pool is None:
+                previous_threads = os.environ.get("OMP_NUM_THREADS")
+                os.environ["OMP_NUM_THREADS"] = str(max(1, (os.cpu_count() or 1) // self.encode_processes))
+                try:
+                    self._encode_pool = self.model.start_multi_process_pool(['cpu'] * self.encode_processes)
+                finally:
+                    if previous_threads is None:
+                        del os.environ["OMP_NUM_THREADS"]
+                    else:
+                        os.environ["OMP_NUM_THREADS"] = previous_threads
+                atexit.register(self.close_pool)
+                print(f"✅ Started {self.encode_processes} S-BERT encoding processes")
+            return self._encode_pool
+    
+    def close_pool(self):
+        """Stop the multi-process encoding pool, if it was started."""
+        with self._encode_pool_lock:
+            if self._encode_pool is not None:
+                self.model.stop_multi_process_pool(self._encode_pool)
+                self._encode_pool = None
+    
+    def _recall_embeddings(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Get the embeddings of recently encoded texts from memory."""
+        with self._embedding_memo_lock:
+            found = {}
+            for key in keys:
+                embedding = self._embedding_memo.get(key)
+                if embedding is not None:
+                    self._embedding_memo.move_to_end(key)
+                    found[key] = embedding
+            return found
+    
+    def _remember_embeddings(self, embeddings: Dict[str, np.ndarray]):
+        """Keep embeddings in memory, dropping the least recently used ones."""
+        with self._embedding_memo_lock:
+            for key, embedding in embeddings.items():
+                self._embedding_memo[key] = embedding
+                self._embedding_memo.move_to_end(key)
+            while len(self._embedding_memo) > TEXT_CACHE_SIZE:
+                self._embedding_memo.popitem(last=False)
+    
+    def calculate_similarities_batch(self, job_description: str, resume_texts: List[str],
+                                     return_embeddings: bool = False):
+        """
+        Calculate semantic similarity between a job description and many resumes.
+        
+        The job description and all resumes are encoded in a single S-BERT
+        call, so the job description is embedded once and the transformer
+        can batch the resumes together. Passing every text to one encode()
+        call also lets sentence-transformers length-sort the whole set, so
+        short and long resumes do not share a padded batch. Texts are cut to
+        the model's maximum sequence length before tokenization. Identical
+        resume texts are preprocessed, looked up and scored only once.
+        
+        Args:
+            job_description (str): Job description text
+            resume_texts (List[str]): Resume texts
+            return_embeddings (bool): Also return the resume embeddings
+            
+        Returns:
+            np.ndarray: Similarity scores between 0 and 1, one per resume, or
+                a (scores, resume embeddings) tuple if return_embeddings is set
+        """
+        if not resume_texts:
+            scores = np.zeros(0, dtype=np.float32)
+            return (scores, np.zeros((0, 0), dtype=np.float32)) if return_embeddings else scores
+        
+        try:
+            # Index of every resume's text among the distinct texts
+            unique = {}
+            inverse = np.fromiter((unique.setdefault(text, len(unique)) for text in resume_texts),
+                                  dtype=np.intp, count=len(resume_texts))
+            
+            texts = [self.preprocess_text(job_description)]
+            texts.extend(self.preprocess_text(text) for text in unique)
+            texts = [text[:self.max_text_chars] for text in texts]
+            
+            embeddings = self.encode_texts(texts)
+            
+            # Contiguous float32 operands for the SIMD / BLAS kernels
+            resume_matrix = np.ascontiguousarray(embeddings[1:], dtype=np.float32)
+            job_vector = np.ascontiguousarray(embeddings[0], dtype=np.float32)
+            scores = cosine_scores(resume_matrix, job_vector, self.device)
+            
+            # Ensure scores are between 0 and 1, then fan out to duplicates
+            scores = np.clip(scores, 0.0, 1.0)
+            if len(unique) < len(resume_texts):
+                scores = scores[inverse]
+                if return_embeddings:
+                    resume_matrix = resume_matrix[inverse]
+            return (scores, resume_matrix) if return_embeddings else scores
+            
+        except Exception as e:
+            print(f"Error calculating batch similarity: {str(e)}")
+            scores = np.zeros(len(resume_texts), dtype=np.float32)
+            return (scores, None) if return_embeddings else scores
+    
+    def calculate_weighted_similarity(self, job_description: str, resume_text: str,
+                                      overall_similarity: Optional[float] = None) -> Dict[str, float]:
         """
         Calculate weighted similarity considering different aspects.
         
         Args:
             job_description (str): Job description text
             resume_text (str): Resume text
+            overall_similarity (Optional[float]): Precomputed semantic
+                similarity, to skip encoding the texts again
             
         Returns:
             Dict[str, float]: Dictionary with different similarity scores
         """
         try:
             # Overall semantic similarity
-            overall_similarity = self.calculate_similarity(job_description, resume_text)
+            if overall_similarity is None:
+                overall_similarity = self.calculate_similarity(job_description, resume_text)
+            
+            # Lowercase and scan each text once for all keyword sub-scores
+            job_features = self._analyze(job_description)
+            resume_features = self._analyze(resume_text)
             
             # Skills-based similarity
-            skills_similarity = self._calculate_skills_similarity(job_description, resume_text)
+            skills_similarity = self._skills_score(job_features, resume_features)
             
             # Experience-based similarity
-            experience_similarity = self._calculate_experience_similarity(job_description, resume_text)
+            experience_similarity = self._experience_score(job_features, resume_features)
             
             # Education-based similarity
-            education_similarity = self._calculate_education_similarity(job_description, resume_text)
+            education_similarity = self._education_score(job_features, resume_features)
             
             # Calculate weighted average
             weights = {
@@ -197,76 +784,102 @@ class JobMatcher:
                 'weighted_score': 0.0
             }
     
+    def _analyze(self, text: str) -> TextFeatures:
+        """Lowercase a text once and extract the features of all keyword sub-scores."""
+        text_lower = text.lower()
+        keywords = self._scan_keywords(text_lower)
+        return TextFeatures(
+            skill_mask=self._skill_mask(text_lower),
+            experience=keywords['experience'],
+            education=keywords['education']
+        )
+    
     def _calculate_skills_similarity(self, job_description: str, resume_text: str) -> float:
         """Calculate similarity based on skills mentioned."""
-        job_skills = self._extract_skills_from_text(job_description.lower())
-        resume_skills = self._extract_skills_from_text(resume_text.lower())
-        
-        if not job_skills:
-            return 0.0
-        
-        # Calculate Jaccard similarity for skills
-        intersection = len(job_skills.intersection(resume_skills))
-        union = len(job_skills.union(resume_skills))
-        
-        if union == 0:
-            return 0.0
-        
-        return intersection / union
+        return self._skills_score(self._analyze(job_description), self._analyze(resume_text))
     
     def _calculate_experience_similarity(self, job_description: str, resume_text: str) -> float:
         """Calculate similarity based on experience keywords."""
-        job_exp_keywords = self._extract_keywords(job_description.lower(), self.experience_keywords)
-        resume_exp_keywords = self._extract_keywords(resume_text.lower(), self.experience_keywords)
-        
-        if not job_exp_keywords:
-            return 0.0
-        
-        intersection = len(job_exp_keywords.intersection(resume_exp_keywords))
-        return intersection / len(job_exp_keywords)
+        return self._experience_score(self._analyze(job_description), self._analyze(resume_text))
     
     def _calculate_education_similarity(self, job_description: str, resume_text: str) -> float:
         """Calculate similarity based on education keywords."""
-        job_edu_keywords = self._extract_keywords(job_description.lower(), self.education_keywords)
-        resume_edu_keywords = self._extract_keywords(resume_text.lower(), self.education_keywords)
-        
-        if not job_edu_keywords:
+        return self._education_score(self._analyze(job_description), self._analyze(resume_text))
+    
+    @staticmethod
+    def _skills_score(job: TextFeatures, resume: TextFeatures) -> float:
+        """Jaccard similarity of the skill sets, computed on their bitmasks."""
+        if not job.skill_mask:
+            return 0.0
+        return popcount(job.skill_mask & resume.skill_mask) / popcount(job.skill_mask | resume.skill_mask)
+    
+    @staticmethod
+    def _experience_score(job: TextFeatures, resume: TextFeatures) -> float:
+        """Share of the job's experience keywords found in the resume."""
+        if not job.experience:
+            return 0.0
+        return len(job.experience & resume.experience) / len(job.experience)
+    
+    @staticmethod
+    def _education_score(job: TextFeatures, resume: TextFeatures) -> float:
+        """Share of the job's education keywords found in the resume."""
+        if not job.education:
             return 0.5  # Neutral score if no education requirements
-        
-        intersection = len(job_edu_keywords.intersection(resume_edu_keywords))
-        return intersection / len(job_edu_keywords)
+        return len(job.education & resume.education) / len(job.education)
     
-    def _extract_skills_from_text(self, text: str) -> set:
+    def _extract_skills_from_text(self, text: str) -> frozenset:
         """Extract technical skills from text."""
-        skills = set()
-        
-        for skill in self.skill_keywords:
-            if skill in text:
-                skills.add(skill)
+        return frozenset(self._extract_skills_from_keywords(text, self._scan_keywords(text)['skills']))
+    
+    def _skill_mask(self, text: str) -> int:
+        """Encode the skills of a text as a bitmask over the skill vocabulary."""
+        mask = 0
+        for skill in self._extract_skills_from_text(text):
+            bit = self._skill_bits.get(skill)
+            if bit is None:
+                with self._skill_bits_lock:
+                    bit = self._skill_bits.setdefault(skill, len(self._skill_bits))
+            mask |= 1 << bit
+        return mask
+    
+    def _extract_skills_from_keywords(self, text: str, skill_keywords: set) -> set:
+        """Combine the skill keywords found in a text with its skill pattern matches."""
+        skills = set(skill_keywords)
         
         # Additional skill patterns
-        skill_patterns = [
-            r'\b(?:python|java|javascript|c\+\+|c#|php|ruby|go|rust|swift|kotlin)\b',
-            r'\b(?:react|angular|vue|node\.?js|django|flask|spring|laravel)\b',
-            r'\b(?:mysql|postgresql|mongodb|redis|elasticsearch|oracle)\b',
-            r'\b(?:aws|azure|gcp|docker|kubernetes|jenkins|git|github)\b'
-        ]
-        
-        for pattern in skill_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            skills.update([match.lower() for match in matches])
+        for pattern in self._skill_res:
+            skills.update(match.lower() for match in pattern.findall(text))
         
         return skills
     
-    def _extract_keywords(self, text: str, keywords: List[str]) -> set:
-        """Extract specific keywords from text."""
-        found_keywords = set()
+    def _extract_keywords(self, text: str, category: str) -> frozenset:
+        """Extract the keywords of a category ('skills', 'experience' or 'education') from text."""
+        return self._scan_keywords(text)[category]
+    
+    def _scan_keywords(self, text: str) -> Dict[str, frozenset]:
+        """
+        Find the keywords of every category contained in a text.
         
-        for keyword in keywords:
-            if keyword in text:
-                found_keywords.add(keyword)
+        With pyahocorasick installed this is a single pass over the text;
+        otherwise each keyword is searched for separately.
         
-        return found_keywords
+        Args:
+            text (str): Lowercased text
+            
+        Returns:
+            Dict[str, frozenset]: Keywords found, by category
+        """
+        if self._keyword_automaton is None:
+            return {
+                category: frozenset(keyword for keyword in keywords if keyword in text)
+                for category, keywords in self._keyword_categories.items()
+            }
+        
+        found = {category: set() for category in self._keyword_categories}
+        for _, (keyword, categories) in self._keyword_automaton.iter(text):
+            for category in categories:
+                found[category].add(keyword)
+        return {category: frozenset(keywords) for category, keywords in found.items()}
     
     def analyze_job_description(self, job_description: str) -> Dict[str, any]:
         """
@@ -278,17 +891,19 @@ class JobMatcher:
         Returns:
             Dict[str, any]: Analysis results
         """
+        job_description_lower = job_description.lower()
+        keywords = self._scan_keywords(job_description_lower)
+        
         analysis = {
             'word_count': len(job_description.split()),
             'character_count': len(job_description),
-            'skills': list(self._extract_skills_from_text(job_description.lower())),
-            'experience': list(self._extract_keywords(job_description.lower(), self.experience_keywords)),
-            'education': list(self._extract_keywords(job_description.lower(), self.education_keywords))
+            'skills': list(self._extract_skills_from_keywords(job_description_lower, keywords['skills'])),
+            'experience': list(keywords['experience']),
+            'education': list(keywords['education'])
         }
         
         # Extract required years of experience
-        exp_pattern = r'(\d+)\s*(?:\+)?\s*years?\s+(?:of\s+)?experience'
-        exp_matches = re.findall(exp_pattern, job_description, re.IGNORECASE)
+        exp_matches = self._exp_re.findall(job_description)
         if exp_matches:
             analysis['required_experience_years'] = int(exp_matches[0])
         else:
@@ -299,7 +914,7 @@ class JobMatcher:
         
         return analysis
     
-    def rank_resumes(self, job_description: str, resumes: List[Dict]) -> List[Dict]:
+    def rank_resumes(self, job_description: str, resumes: List[Dict]) -> RankedResumes:
         """
         Rank multiple resumes against a job description.
         
@@ -308,25 +923,14 @@ class JobMatcher:
             resumes (List[Dict]): List of resume dictionaries with 'text' and 'filename'
             
         Returns:
-            List[Dict]: Ranked list of resumes with similarity scores
+            RankedResumes: Resumes sorted by similarity score in descending order
         """
-        ranked_resumes = []
-        
-        for resume in resumes:
-            similarity_score = self.calculate_similarity(job_description, resume['text'])
-            weighted_scores = self.calculate_weighted_similarity(job_description, resume['text'])
-            
-            ranked_resumes.append({
-                'filename': resume['filename'],
-                'similarity_score': similarity_score,
-                'weighted_scores': weighted_scores,
-                'text': resume['text']
-            })
+        texts = [resume['text'] for resume in resumes]
         
-        # Sort by similarity score in descending order
-        ranked_resumes.sort(key=lambda x: x['similarity_score'], reverse=True)
+        # Encode the job description and all resumes in one batched pass
+        scores = self.calculate_similarities_batch(job_description, texts)
         
-        return ranked_resumes
+        return RankedResumes(self, job_description, [resume['filename'] for resume in resumes], texts, scores)
     
     def get_matching_explanation(self, job_description: str, resume_text: str) -> Dict[str, any]:
         """
@@ -2,14 +2,20 @@ import fitz  # fitz
 import docx
 import re
 import spacy
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import os
+import threading
+from bisect import bisect_right
+from itertools import accumulate
 
 class ResumeParser:
     def __init__(self):
         """Initialize the resume parser with spaCy model."""
         try:
-            self.nlp = spacy.load("en_core_web_sm")
+            # Only named entities and sentences are used, so skip tagging, parsing
+            # and lemmatization and split sentences with the rule-based sentencizer
+            self.nlp = spacy.load("en_core_web_sm", disable=["tagger", "parser", "attribute_ruler", "lemmatizer"])
+            self.nlp.add_pipe("sentencizer")
         except OSError:
             # Fallback if spaCy model is not installed
             self.nlp = None
@@ -31,6 +37,47 @@ class ResumeParser:
             r'\b(?:linux|windows|macos|agile|scrum|jira|confluence|slack|microsoft\s*office)\b'
         ]
         
+        # Degree patterns
+        self.degree_patterns = [
+            r'b\.?tech|bachelor of technology',
+            r'm\.?tech|master of technology',
+            r'b\.?e\.?|bachelor of engineering',
+            r'm\.?e\.?|master of engineering',
+            r'mba|master of business administration',
+            r'mca|master of computer applications',
+            r'bca|bachelor of computer applications',
+            r'b\.?sc|bachelor of science',
+            r'm\.?sc|master of science',
+            r'phd|doctorate'
+        ]
+        
+        # Job title patterns
+        self.job_patterns = [
+            r'(?:software|web|mobile|data|ml|ai)\s+(?:engineer|developer|analyst|scientist)',
+            r'(?:senior|junior|lead|principal)\s+(?:engineer|developer|analyst)',
+            r'(?:project|product|technical)\s+(?:manager|lead)',
+            r'(?:full\s*stack|front\s*end|back\s*end)\s+developer',
+            r'(?:data|business|system)\s+analyst'
+        ]
+        
+        # Years of experience patterns
+        self.years_patterns = [
+            r'(\d+)\s*(?:\+)?\s*years?\s+(?:of\s+)?experience',
+            r'experience\s+(?:of\s+)?(\d+)\s*(?:\+)?\s*years?',
+            r'(\d+)\s*(?:\+)?\s*yrs?\s+(?:of\s+)?(?:exp|experience)',
+            r'(?:exp|experience)\s+(?:of\s+)?(\d+)\s*(?:\+)?\s*yrs?'
+        ]
+        
+        # Compile the patterns once instead of on every extraction
+        self._skill_res = [re.compile(pattern, re.IGNORECASE) for pattern in self.skill_patterns]
+        self._degree_res = [re.compile(pattern, re.IGNORECASE) for pattern in self.degree_patterns]
+        self._job_res = [re.compile(pattern, re.IGNORECASE) for pattern in self.job_patterns]
+        self._years_res = [re.compile(pattern, re.IGNORECASE) for pattern in self.years_patterns]
+        self._email_re = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+        self._phone_re = re.compile(r'(?:\+?1[-.\s]?)?$$?[0-9]{3}$$?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}')
+        self._linkedin_re = re.compile(r'linkedin\.com/in/[\w-]+', re.IGNORECASE)
+        self._github_re = re.compile(r'github\.com/[\w-]+', re.IGNORECASE)
+        
         self.education_keywords = [
             'bachelor', 'master', 'phd', 'doctorate', 'degree', 'diploma', 'certificate',
             'b.tech', 'b.e', 'm.tech', 'm.e', 'mba', 'mca', 'bca', 'b.sc', 'm.sc',
@@ -44,11 +91,28 @@ class ResumeParser:
             'years', 'months', 'intern', 'internship', 'trainee', 'junior', 'senior',
             'lead', 'manager', 'developer', 'engineer', 'analyst', 'consultant'
         ]
+        
+        # One alternation per keyword list finds every keyword occurrence in a
+        # single scan. spaCy sentences can contain '.', so the Doc path uses
+        # every keyword; the split('.') fallback leaves out keywords containing
+        # '.', since no sentence split on '.' can contain them.
+        self._education_keyword_re = self._keyword_alternation(self.education_keywords)
+        self._experience_keyword_re = self._keyword_alternation(self.experience_keywords)
+        self._education_split_keyword_re = self._keyword_alternation(
+            [keyword for keyword in self.education_keywords if '.' not in keyword]
+        )
+        self._experience_split_keyword_re = self._keyword_alternation(
+            [keyword for keyword in self.experience_keywords if '.' not in keyword]
+        )
     
-    def parse_resume(self, file_path: str) -> Optional[str]:
+    @staticmethod
+    def parse_resume(file_path: str) -> Optional[str]:
         """
         Parse resume from PDF or DOCX file and extract text.
         
+        Needs no parser state, so the apps' parse thread pools can run it
+        without loading spaCy.
+        
         Args:
             file_path (str): Path to the resume file
             
@@ -59,9 +123,9 @@ class ResumeParser:
             file_extension = os.path.splitext(file_path)[1].lower()
             
             if file_extension == '.pdf':
-                return self._parse_pdf(file_path)
+                return ResumeParser._parse_pdf(file_path)
             elif file_extension == '.docx':
-                return self._parse_docx(file_path)
+                return ResumeParser._parse_docx(file_path)
             else:
                 raise ValueError(f"Unsupported file format: {file_extension}")
                 
@@ -69,37 +133,34 @@ class ResumeParser:
             print(f"Error parsing resume {file_path}: {str(e)}")
             return None
     
-    def _parse_pdf(self, file_path: str) -> str:
+    @staticmethod
+    def _parse_pdf(file_path: str) -> str:
         """Extract text from PDF file using PyMuPDF."""
-        text = ""
         try:
-            doc = PyMuPDF.open(file_path)
-            for page in doc:
-                text += page.get_text()
-            doc.close()
+            # Plain-text extraction only; the document is closed as soon as
+            # the last page has been read
+            with fitz.open(file_path) as doc:
+                text = "".join([page.get_text("text", flags=fitz.TEXTFLAGS_TEXT) for page in doc])
         except Exception as e:
             raise Exception(f"Error parsing PDF: {str(e)}")
         
         return text.strip()
     
-    def _parse_docx(self, file_path: str) -> str:
+    @staticmethod
+    def _parse_docx(file_path: str) -> str:
         """Extract text from DOCX file using python-docx."""
         try:
             doc = docx.Document(file_path)
-            text = ""
             
             # Extract text from paragraphs
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+            parts = [paragraph.text + "\n" for paragraph in doc.paragraphs]
             
-            # Extract text from tables
+            # Extract text from tables, one line per row
             for table in doc.tables:
                 for row in table.rows:
-                    for cell in row.cells:
-                        text += cell.text + " "
-                    text += "\n"
+                    parts.append("".join([cell.text + " " for cell in row.cells]) + "\n")
             
-            return text.strip()
+            return "".join(parts).strip()
             
         except Exception as e:
             raise Exception(f"Error parsing DOCX: {str(e)}")
@@ -115,15 +176,19 @@ class ResumeParser:
             Dict[str, List[str]]: Dictionary containing extracted information
         """
         resume_text_lower = resume_text.lower()
-        
+        doc = self.nlp(resume_text_lower) if self.nlp else None
+        return self._extract_information(resume_text, resume_text_lower, doc)
+    
+    def _extract_information(self, resume_text: str, resume_text_lower: str, doc) -> Dict[str, List[str]]:
+        """Extract structured information given the lowercased text and its spaCy Doc."""
         # Extract skills
-        skills = self._extract_skills(resume_text_lower)
+        skills = self._extract_skills(resume_text_lower, doc)
         
         # Extract education information
-        education = self._extract_education(resume_text_lower)
+        education = self._extract_education(resume_text_lower, doc)
         
         # Extract experience information
-        experience = self._extract_experience(resume_text_lower)
+        experience = self._extract_experience(resume_text_lower, doc)
         
         # Extract contact information
         contact = self._extract_contact_info(resume_text)
@@ -139,18 +204,16 @@ class ResumeParser:
             'years_of_experience': years_exp
         }
     
-    def _extract_skills(self, text: str) -> List[str]:
-        """Extract technical skills from resume text."""
+    def _extract_skills(self, text: str, doc=None) -> List[str]:
+        """Extract technical skills from resume text and, if given, its spaCy Doc."""
         skills = set()
         
         # Use regex patterns to find skills
-        for pattern in self.skill_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            skills.update([match.lower() for match in matches])
+        for pattern in self._skill_res:
+            skills.update(match.lower() for match in pattern.findall(text))
         
         # Use spaCy for named entity recognition if available
-        if self.nlp:
-            doc = self.nlp(text)
+        if doc is not None:
             for ent in doc.ents:
                 if ent.label_ in ['ORG', 'PRODUCT']:  # Organizations and products might be technologies
                     skills.add(ent.text.lower())
@@ -164,64 +227,61 @@ class ResumeParser:
         
         return list(set(cleaned_skills))[:20]  # Return top 20 unique skills
     
-    def _extract_education(self, text: str) -> List[str]:
-        """Extract education information from resume text."""
-        education_info = []
-        
-        # Look for education keywords
-        for keyword in self.education_keywords:
-            if keyword in text:
-                # Find sentences containing education keywords
-                sentences = text.split('.')
-                for sentence in sentences:
-                    if keyword in sentence:
-                        education_info.append(sentence.strip())
+    @staticmethod
+    def _keyword_alternation(keywords: List[str]) -> re.Pattern:
+        """Compile a regex matching any of the keywords."""
+        return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+    
+    @staticmethod
+    def _keyword_sentences(text: str, keyword_re: re.Pattern, min_length: int = 0, doc=None) -> List[str]:
+        """
+        Get the sentences of a text that contain a keyword.
         
-        # Extract degree patterns
-        degree_patterns = [
-            r'b\.?tech|bachelor of technology',
-            r'm\.?tech|master of technology',
-            r'b\.?e\.?|bachelor of engineering',
-            r'm\.?e\.?|master of engineering',
-            r'mba|master of business administration',
-            r'mca|master of computer applications',
-            r'bca|bachelor of computer applications',
-            r'b\.?sc|bachelor of science',
-            r'm\.?sc|master of science',
-            r'phd|doctorate'
-        ]
+        Args:
+            text (str): Lowercased resume text
+            keyword_re (re.Pattern): Alternation of the keywords; without a Doc
+                it must not match across a '.'
+            min_length (int): Only keep stripped sentences longer than this
+            doc: spaCy Doc of the text; its sentences are used when given,
+                otherwise the text is split on '.'
+            
+        Returns:
+            List[str]: Stripped sentences containing at least one keyword
+        """
+        if doc is not None:
+            sents = list(doc.sents)
+            sentences = [sent.text for sent in sents]
+            starts = [sent.start_char for sent in sents]
+        else:
+            sentences = text.split('.')
+            starts = list(accumulate((len(sentence) + 1 for sentence in sentences[:-1]), initial=0))
+        
+        # Locate the sentence of every keyword occurrence by its offset
+        hits = {bisect_right(starts, match.start()) - 1 for match in keyword_re.finditer(text)}
+        stripped = (sentences[i].strip() for i in sorted(hits))
+        return [sentence for sentence in stripped if len(sentence) > min_length]
+    
+    def _extract_education(self, text: str, doc=None) -> List[str]:
+        """Extract education information from resume text and, if given, its spaCy Doc."""
+        # Find sentences containing education keywords
+        keyword_re = self._education_keyword_re if doc is not None else self._education_split_keyword_re
+        education_info = self._keyword_sentences(text, keyword_re, doc=doc)
         
-        for pattern in degree_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            education_info.extend(matches)
+        # Extract degree patterns
+        for pattern in self._degree_res:
+            education_info.extend(pattern.findall(text))
         
         return list(set(education_info))[:10]  # Return unique education info
     
-    def _extract_experience(self, text: str) -> List[str]:
-        """Extract work experience information from resume text."""
-        experience_info = []
-        
-        # Look for experience keywords
-        for keyword in self.experience_keywords:
-            if keyword in text:
-                # Find sentences containing experience keywords
-                sentences = text.split('.')
-                for sentence in sentences:
-                    if keyword in sentence and len(sentence.strip()) > 10:
-                        experience_info.append(sentence.strip())
+    def _extract_experience(self, text: str, doc=None) -> List[str]:
+        """Extract work experience information from resume text and, if given, its spaCy Doc."""
+        # Find sentences containing experience keywords
+        keyword_re = self._experience_keyword_re if doc is not None else self._experience_split_keyword_re
+        experience_info = self._keyword_sentences(text, keyword_re, min_length=10, doc=doc)
         
         # Extract job titles and companies
-        job_patterns = [
-            r'(?:software|web|mobile|data|ml|ai)\s+(?:engineer|developer|analyst|scientist)',
-            r'(?:senior|junior|lead|principal)\s+(?:engineer|developer|analyst)',
-            r'(?:project|product|technical)\s+(?:manager|lead)',
-            r'(?:full\s*stack|front\s*end|back\s*end)\s+developer',
-            r'(?:data|business|system)\s+analyst'
-        ]
-        
-        for pattern in job_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            experience_info.extend(matches)
+        for pattern in self._job_res:
+            experience_info.extend(pattern.findall(text))
         
         return list(set(experience_info))[:15]  # Return unique experience info
     
@@ -230,26 +290,22 @@ class ResumeParser:
         contact_info = {}
         
         # Email pattern
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
+        emails = self._email_re.findall(text)
         if emails:
             contact_info['email'] = emails[0]
         
         # Phone pattern
-        phone_pattern = r'(?:\+?1[-.\s]?)?$$?[0-9]{3}$$?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}'
-        phones = re.findall(phone_pattern, text)
+        phones = self._phone_re.findall(text)
         if phones:
             contact_info['phone'] = phones[0]
         
         # LinkedIn pattern
-        linkedin_pattern = r'linkedin\.com/in/[\w-]+'
-        linkedin = re.findall(linkedin_pattern, text, re.IGNORECASE)
+        linkedin = self._linkedin_re.findall(text)
         if linkedin:
             contact_info['linkedin'] = linkedin[0]
         
         # GitHub pattern
-        github_pattern = r'github\.com/[\w-]+'
-        github = re.findall(github_pattern, text, re.IGNORECASE)
+        github = self._github_re.findall(text)
         if github:
             contact_info['github'] = github[0]
         
@@ -257,16 +313,8 @@ class ResumeParser:
     
     def _extract_years_of_experience(self, text: str) -> Optional[int]:
         """Extract years of experience from resume text."""
-        # Pattern to match years of experience
-        exp_patterns = [
-            r'(\d+)\s*(?:\+)?\s*years?\s+(?:of\s+)?experience',
-            r'experience\s+(?:of\s+)?(\d+)\s*(?:\+)?\s*years?',
-            r'(\d+)\s*(?:\+)?\s*yrs?\s+(?:of\s+)?(?:exp|experience)',
-            r'(?:exp|experience)\s+(?:of\s+)?(\d+)\s*(?:\+)?\s*yrs?'
-        ]
-        
-        for pattern in exp_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self._years_res:
+            matches = pattern.findall(text)
             if matches:
                 try:
                     return int(matches[0])
@@ -298,3 +346,32 @@ class ResumeParser:
             'top_skills': info['skills'][:5],
             'extracted_info': info
         }
+
+# Parser used by parse_resume_file, created once per process
+_worker_parser = None
+_worker_parser_lock = threading.Lock()
+
+def parse_resume_file(file_path: str) -> Tuple[str, Optional[str], Optional[Dict[str, List[str]]]]:
+    """
+    Parse a resume file and extract its information.
+    
+    Defined at module level so it can be run in a thread or process pool;
+    one ResumeParser is loaded per process on first use and shared by its
+    threads.
+    
+    Args:
+        file_path (str): Path to the resume file
+        
+    Returns:
+        Tuple[str, Optional[str], Optional[Dict[str, List[str]]]]: File path,
+            extracted text and extracted information (None if parsing fails)
+    """
+    global _worker_parser
+    with _worker_parser_lock:
+        if _worker_parser is None:
+            _worker_parser = ResumeParser()
+    
+    resume_text = _worker_parser.parse_resume(file_path)
+    if not resume_text:
+        return file_path, None, None
+    return file_path, resume_text, _worker_parser.extract_information(resume_text)
@@ -7,6 +7,8 @@ import os
 import sys
 import subprocess
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
 from pathlib import Path
 
 def print_header(text):
@@ -73,25 +75,33 @@ def install_dependencies():
     pip_cmd = "venv/Scripts/pip" if os.name == 'nt' else "venv/bin/pip"
     
     packages = [
-        "streamlit>=1.28.0",
-        "sentence-transformers>=2.2.2",
+        "streamlit>=1.37.0",
+        "sentence-transformers>=3.2.0",
         "PyMuPDF>=1.23.0",
         "python-docx>=0.8.11",
-        "scikit-learn>=1.3.0",
         "spacy>=3.6.0",
         "pandas>=2.0.0",
         "numpy>=1.24.0",
         "plotly>=5.15.0",
         "nltk>=3.8.1",
-        "sqlalchemy>=2.0.0",
+        "sqlalchemy>=2.0.10",
         "python-dotenv>=1.0.0",
         "bcrypt>=4.0.0",
         "Pillow>=10.0.0"
     ]
     
+    # Quote the requirement specifiers so the shell does not treat ">=" as a redirect
+    specs = [f'"{package}"' for package in packages]
+    
+    # One pip run resolves and downloads everything together
     print("   📦 Installing packages...")
-    for package in packages:
-        if not run_command(f"{pip_cmd} install {package}", f"Installing {package.split('>=')[0]}"):
+    if run_command(f"{pip_cmd} install {' '.join(specs)}", "Installing all packages"):
+        return True
+    
+    # Install one at a time to find out which package fails
+    print("   🔁 Retrying packages individually...")
+    for package, spec in zip(packages, specs):
+        if not run_command(f"{pip_cmd} install {spec}", f"Installing {package.split('>=')[0]}"):
             return False
     
     return True
@@ -109,30 +119,15 @@ def download_models():
     
     # Download NLTK data
     print("   📚 Downloading NLTK data...")
-    nltk_script = """
-import nltk
-import ssl
-try:
-    _create_unverified_https_context = ssl._create_unverified_context
-except AttributeError:
-    pass
-else:
-    ssl._create_default_https_context = _create_unverified_https_context
-
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
-nltk.download('wordnet', quiet=True)
-print('NLTK data downloaded successfully')
-"""
+    # Runs inline with -c, so no script file is written; the code uses no double
+    # quotes so it can be wrapped in them for both cmd.exe and POSIX shells
+    nltk_script = (
+        "import ssl, nltk; "
+        "ssl._create_default_https_context = ssl._create_unverified_context; "
+        "nltk.download(['punkt', 'stopwords', 'wordnet'], quiet=True)"
+    )
     
-    with open("temp_nltk_download.py", "w") as f:
-        f.write(nltk_script)
-    
-    run_command(f"{python_cmd} temp_nltk_download.py", "Downloading NLTK data")
-    
-    # Clean up
-    if os.path.exists("temp_nltk_download.py"):
-        os.remove("temp_nltk_download.py")
+    run_command(f'{python_cmd} -c "{nltk_script}"', "Downloading NLTK data")
     
     return True
 
@@ -161,66 +156,84 @@ def setup_database():
     print_step(6, "Setting Up Database")
     
     try:
-        # Create database connection
-        conn = sqlite3.connect('data/smarthire.db')
-        cursor = conn.cursor()
-        
-        # Create tables
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT DEFAULT 'user',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS job_postings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT NOT NULL,
-                requirements TEXT,
-                created_by INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (created_by) REFERENCES users (id)
-            )
-        ''')
+        # Create tables and indexes in one script; WAL mode is stored in the
+        # database file, so the app's connections start with it as well
+        schema = '''
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-64000;
+        BEGIN;
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT DEFAULT 'user',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE IF NOT EXISTS job_postings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            requirements TEXT,
+            created_by INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (created_by) REFERENCES users (id)
+        );
+        CREATE TABLE IF NOT EXISTS screening_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_posting_id INTEGER,
+            session_name TEXT,
+            created_by INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (job_posting_id) REFERENCES job_postings (id),
+            FOREIGN KEY (created_by) REFERENCES users (id)
+        );
+        CREATE TABLE IF NOT EXISTS resume_analyses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER,
+            filename TEXT NOT NULL,
+            similarity_score REAL,
+            skills_extracted TEXT,
+            education_extracted TEXT,
+            experience_extracted TEXT,
+            analysis_data TEXT,
+            word_count INTEGER,
+            years_of_experience INTEGER,
+            embedding BLOB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (session_id) REFERENCES screening_sessions (id)
+        );
+        CREATE TABLE IF NOT EXISTS resume_previews (
+            analysis_id INTEGER PRIMARY KEY,
+            preview TEXT,
+            FOREIGN KEY (analysis_id) REFERENCES resume_analyses (id)
+        );
+        CREATE TABLE IF NOT EXISTS resume_skills (
+            analysis_id INTEGER,
+            skill VARCHAR(100),
+            PRIMARY KEY (analysis_id, skill),
+            FOREIGN KEY (analysis_id) REFERENCES resume_analyses (id)
+        );
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            content_hash VARCHAR(64) PRIMARY KEY,
+            embedding BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS ix_ra_session_score ON resume_analyses (session_id, similarity_score DESC);
+        CREATE INDEX IF NOT EXISTS ix_jp_created ON job_postings (created_at DESC);
+        CREATE INDEX IF NOT EXISTS ix_ss_created ON screening_sessions (created_at DESC);
+        CREATE INDEX IF NOT EXISTS ix_rs_skill ON resume_skills (skill);
+        COMMIT;
+        '''
         
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS screening_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                job_posting_id INTEGER,
-                session_name TEXT,
-                created_by INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (job_posting_id) REFERENCES job_postings (id),
-                FOREIGN KEY (created_by) REFERENCES users (id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS resume_analyses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id INTEGER,
-                filename TEXT NOT NULL,
-                similarity_score REAL,
-                skills_extracted TEXT,
-                education_extracted TEXT,
-                experience_extracted TEXT,
-                analysis_data TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (session_id) REFERENCES screening_sessions (id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        # Autocommit connection, so the script's BEGIN/COMMIT is the only transaction
+        with closing(sqlite3.connect('data/smarthire.db', isolation_level=None)) as conn:
+            conn.executescript(schema)
         
         print("   ✅ Database initialized successfully")
-        print("   📊 Created tables: users, job_postings, screening_sessions, resume_analyses")
+        print("   📊 Created tables: users, job_postings, screening_sessions, resume_analyses, resume_previews, resume_skills, embedding_cache")
         return True
         
     except Exception as e:
@@ -234,6 +247,8 @@ def create_config_files():
     # Create .env file
     env_content = """# SmartHire.AI Configuration
 # Database
+# SQLite connections should keep journal_mode=WAL, synchronous=NORMAL and
+# temp_store=MEMORY set on connect (database.py applies them)
 DATABASE_URL=sqlite:///data/smarthire.db
 
 # Application Settings
@@ -243,6 +258,8 @@ DEBUG=True
 
 # Security
 SECRET_KEY=your-secret-key-change-this-in-production
+# bcrypt cost factor for new password hashes (each +1 doubles hashing time)
+BCRYPT_ROUNDS=12
 
 # File Upload Settings
 MAX_FILE_SIZE_MB=10
@@ -250,6 +267,16 @@ ALLOWED_EXTENSIONS=pdf,docx
 
 # Model Settings
 SBERT_MODEL=all-MiniLM-L6-v2
+# torch, or onnx for an ONNX Runtime model on CPU
+SBERT_BACKEND=torch
+# avx2, avx512, avx512_vnni or arm64 (int8), or none for an O3-optimized float32 model
+SBERT_ONNX_QUANTIZATION=avx2
+# Compile the torch model with torch.compile (PyTorch 2.x)
+SBERT_COMPILE=False
+# Run the torch model in float16 on GPU or int8 (dynamic quantization) on CPU
+SBERT_QUANTIZE=False
+# Worker processes for encoding large batches on CPU (0 = encode in-process)
+SBERT_ENCODE_PROCESSES=0
 SIMILARITY_THRESHOLD=0.5
 
 # Logging
@@ -263,33 +290,46 @@ LOG_FILE=logs/smarthire.log
     
     # Create config.py
     config_content = """import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
-load_dotenv()
+@lru_cache(maxsize=1)
+def _load_env():
+    \"\"\"Load .env into the environment once and snapshot the result.\"\"\"
+    load_dotenv()
+    return dict(os.environ)
+
+_env = _load_env()
 
 class Config:
     # Database
-    DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///data/smarthire.db')
+    DATABASE_URL = _env.get('DATABASE_URL', 'sqlite:///data/smarthire.db')
     
     # Application
-    APP_NAME = os.getenv('APP_NAME', 'SmartHire.AI')
-    APP_VERSION = os.getenv('APP_VERSION', '1.0.0')
-    DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
+    APP_NAME = _env.get('APP_NAME', 'SmartHire.AI')
+    APP_VERSION = _env.get('APP_VERSION', '1.0.0')
+    DEBUG = _env.get('DEBUG', 'True').lower() == 'true'
     
     # Security
-    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
+    SECRET_KEY = _env.get('SECRET_KEY', 'dev-secret-key')
+    BCRYPT_ROUNDS = int(_env.get('BCRYPT_ROUNDS', '12'))
     
     # File Upload
-    MAX_FILE_SIZE_MB = int(os.getenv('MAX_FILE_SIZE_MB', '10'))
-    ALLOWED_EXTENSIONS = os.getenv('ALLOWED_EXTENSIONS', 'pdf,docx').split(',')
+    MAX_FILE_SIZE_MB = int(_env.get('MAX_FILE_SIZE_MB', '10'))
+    ALLOWED_EXTENSIONS = _env.get('ALLOWED_EXTENSIONS', 'pdf,docx').split(',')
     
     # Model Settings
-    SBERT_MODEL = os.getenv('SBERT_MODEL', 'all-MiniLM-L6-v2')
-    SIMILARITY_THRESHOLD = float(os.getenv('SIMILARITY_THRESHOLD', '0.5'))
+    SBERT_MODEL = _env.get('SBERT_MODEL', 'all-MiniLM-L6-v2')
+    SBERT_BACKEND = _env.get('SBERT_BACKEND', 'torch')
+    SBERT_ONNX_QUANTIZATION = _env.get('SBERT_ONNX_QUANTIZATION', 'avx2')
+    SBERT_COMPILE = _env.get('SBERT_COMPILE', 'False').lower() == 'true'
+    SBERT_QUANTIZE = _env.get('SBERT_QUANTIZE', 'False').lower() == 'true'
+    SBERT_ENCODE_PROCESSES = int(_env.get('SBERT_ENCODE_PROCESSES', '0'))
+    SIMILARITY_THRESHOLD = float(_env.get('SIMILARITY_THRESHOLD', '0.5'))
     
     # Logging
-    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
-    LOG_FILE = os.getenv('LOG_FILE', 'logs/smarthire.log')
+    LOG_LEVEL = _env.get('LOG_LEVEL', 'INFO')
+    LOG_FILE = _env.get('LOG_FILE', 'logs/smarthire.log')
 """
     
     with open("config/config.py", "w") as f:
@@ -458,8 +498,13 @@ def main():
         check_python_version,
         create_virtual_environment,
         install_dependencies,
+        create_directories
+    ]
+    
+    # Independent of each other once the directories exist, so the
+    # network-bound model download overlaps with writing the project files
+    concurrent_steps = [
         download_models,
-        create_directories,
         setup_database,
         create_config_files,
         create_sample_data,
@@ -472,6 +517,25 @@ def main():
             print("Please check the error messages above and try again.")
             return
     
+    failed = set()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = {executor.submit(step): step for step in concurrent_steps}
+        for future in as_completed(futures):
+            step = futures[future]
+            try:
+                succeeded = future.result()
+            except Exception as e:
+                print(f"   ❌ {step.__name__} raised an error: {str(e)}")
+                succeeded = False
+            if not succeeded:
+                failed.add(step)
+    
+    if failed:
+        names = ", ".join(step.__name__ for step in concurrent_steps if step in failed)
+        print(f"\n❌ Setup failed at: {names}")
+        print("Please check the error messages above and try again.")
+        return
+    
     print_completion_message()
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+"""
+Tests for education sentence extraction in the resume parser
+"""
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+pytest.importorskip("fitz")
+pytest.importorskip("docx")
+
+from resume_parser import ResumeParser
+
+RESUME_TEXT = "john doe. b.tech in computer applications, 2019. m.sc in data analytics from xyz"
+
+@pytest.fixture(scope="module")
+def parser():
+    return ResumeParser()
+
+@pytest.fixture(scope="module")
+def sentencizer():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+def test_education_from_doc_keeps_dotted_degree_sentences(parser, sentencizer):
+    education = parser._extract_education(RESUME_TEXT, sentencizer(RESUME_TEXT))
+
+    assert any("b.tech in computer applications, 2019" in entry for entry in education)
+    assert any("m.sc in data analytics from xyz" in entry for entry in education)
+
+def test_education_without_doc_falls_back_to_degree_patterns(parser):
+    education = parser._extract_education(RESUME_TEXT)
+
+    # Split on '.', the degree names cannot be matched as sentence keywords
+    assert sorted(education) == ["b.tech", "m.sc"]
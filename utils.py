@@ -1,40 +1,131 @@
 import os
+import binascii
 import tempfile
 import shutil
-from typing import Optional
+import threading
+from bisect import bisect_right
+from itertools import islice
+from typing import List, NamedTuple, Optional, Sequence, Union
+import numpy as np
 import streamlit as st
 
+_torch_threads_configured = False
+
+# Chunk size for streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Directories already created by this process
+_ensured_dirs = set()
+_ensured_dirs_lock = threading.Lock()
+
+# Lower bounds of the fair, good and excellent score bands
+SCORE_THRESHOLDS = (0.4, 0.6, 0.8)
+_SCORE_COLORS = (
+    "#dc3545",  # Red
+    "#fd7e14",  # Orange
+    "#ffc107",  # Yellow
+    "#28a745"   # Green
+)
+_SCORE_CATEGORIES = ("Poor Match", "Fair Match", "Good Match", "Excellent Match")
+
+# Lowercased resume file extensions, without the dot
+_SUPPORTED_EXTENSIONS = frozenset({'pdf', 'docx'})
+
+def _physical_cpu_count() -> Optional[int]:
+    """Get the number of physical CPU cores, if psutil is installed."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.cpu_count(logical=False)
+
+def configure_torch_threads(num_threads: Optional[int] = None) -> int:
+    """
+    Size the PyTorch thread pools once per process.
+    
+    torch.set_num_threads sizes the intra-op pool even after numpy's BLAS
+    has been loaded, so no OMP_NUM_THREADS/MKL_NUM_THREADS variables are
+    set. Call this before torch runs any parallel work, as the inter-op
+    pool can only be sized before then.
+    
+    Args:
+        num_threads (Optional[int]): Number of intra-op threads, defaults
+            to the physical core count (logical CPU count without psutil)
+        
+    Returns:
+        int: Number of threads configured
+    """
+    global _torch_threads_configured
+    
+    num_threads = num_threads or _physical_cpu_count() or os.cpu_count() or 4
+    
+    if not _torch_threads_configured:
+        import torch
+        torch.set_num_threads(num_threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Inter-op pool can only be sized before any parallel work starts
+            pass
+        _torch_threads_configured = True
+    
+    return num_threads
+
+def _ensure_dir(directory: str):
+    """Create a directory once per process, skipping the syscall afterwards."""
+    if directory in _ensured_dirs:
+        return
+    os.makedirs(directory, exist_ok=True)
+    with _ensured_dirs_lock:
+        _ensured_dirs.add(directory)
+
 def create_directories():
     """Create necessary directories for the application."""
     directories = ['resumes', 'temp', 'exports']
     
     for directory in directories:
-        if not os.path.exists(directory):
+        try:
             os.makedirs(directory)
             print(f"✅ Created directory: {directory}")
+        except FileExistsError:
+            pass
+        with _ensured_dirs_lock:
+            _ensured_dirs.add(directory)
 
 def save_uploaded_file(uploaded_file) -> str:
     """
     Save uploaded file to temporary directory.
     
+    Every call writes a new file, so uploads with the same name from other
+    sessions or reruns never overwrite each other.
+    
     Args:
         uploaded_file: Streamlit uploaded file object
         
     Returns:
-        str: Path to saved file
+        str: Path to saved file, keeping the upload's extension
     """
     try:
         # Create temp directory if it doesn't exist
         temp_dir = "temp"
-        if not os.path.exists(temp_dir):
-            os.makedirs(temp_dir)
+        _ensure_dir(temp_dir)
         
-        # Generate unique filename
-        file_path = os.path.join(temp_dir, uploaded_file.name)
+        # Generate unique filename; the parser picks the format by extension
+        stem, extension = os.path.splitext(os.path.basename(uploaded_file.name))
+        try:
+            fd, file_path = tempfile.mkstemp(suffix=extension, prefix=f"{stem}_", dir=temp_dir)
+        except FileNotFoundError:
+            # The directory was removed after it was first created; forget it,
+            # recreate it and try once more
+            with _ensured_dirs_lock:
+                _ensured_dirs.discard(temp_dir)
+            _ensure_dir(temp_dir)
+            fd, file_path = tempfile.mkstemp(suffix=extension, prefix=f"{stem}_", dir=temp_dir)
         
-        # Save file
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+        # Stream file to disk in 1 MiB chunks instead of copying the whole buffer
+        uploaded_file.seek(0)
+        with os.fdopen(fd, "wb", buffering=UPLOAD_CHUNK_SIZE) as f:
+            shutil.copyfileobj(uploaded_file, f, UPLOAD_CHUNK_SIZE)
         
         return file_path
         
@@ -42,6 +133,32 @@ def save_uploaded_file(uploaded_file) -> str:
         st.error(f"Error saving file: {str(e)}")
         raise
 
+def remove_saved_file(file_path: str):
+    """
+    Delete a file written by save_uploaded_file once it has been parsed.
+    
+    Args:
+        file_path (str): Path returned by save_uploaded_file
+    """
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+def count_at_or_above(sorted_scores: np.ndarray, thresholds: Sequence[float]) -> np.ndarray:
+    """
+    Count the scores at or above each threshold with a binary search.
+    
+    Args:
+        sorted_scores (np.ndarray): Similarity scores sorted in descending order
+        thresholds (Sequence[float]): Threshold values
+        
+    Returns:
+        np.ndarray: Number of scores >= each threshold
+    """
+    thresholds = np.asarray(thresholds, dtype=sorted_scores.dtype)
+    return np.searchsorted(-sorted_scores, -thresholds, side='right')
+
 def format_score(score: float) -> str:
     """
     Format similarity score for display.
@@ -65,14 +182,7 @@ def get_score_color(score: float) -> str:
     Returns:
         str: Color name or hex code
     """
-    if score >= 0.8:
-        return "#28a745"  # Green
-    elif score >= 0.6:
-        return "#ffc107"  # Yellow
-    elif score >= 0.4:
-        return "#fd7e14"  # Orange
-    else:
-        return "#dc3545"  # Red
+    return _SCORE_COLORS[bisect_right(SCORE_THRESHOLDS, score)]
 
 def get_score_category(score: float) -> str:
     """
@@ -84,25 +194,39 @@ def get_score_category(score: float) -> str:
     Returns:
         str: Score category
     """
-    if score >= 0.8:
-        return "Excellent Match"
-    elif score >= 0.6:
-        return "Good Match"
-    elif score >= 0.4:
-        return "Fair Match"
-    else:
-        return "Poor Match"
+    return _SCORE_CATEGORIES[bisect_right(SCORE_THRESHOLDS, score)]
+
+def format_scores(scores: Sequence[float]) -> List[str]:
+    """
+    Format many similarity scores for display.
+    
+    Args:
+        scores (Sequence[float]): Similarity scores between 0 and 1
+        
+    Returns:
+        List[str]: Formatted score strings, as format_score would return them
+    """
+    percentages = np.asarray(scores, dtype=np.float64) * 100
+    return [f"{percentage:.1f}%" for percentage in percentages.tolist()]
 
 def clean_temp_files():
     """Clean up temporary files."""
     temp_dir = "temp"
-    if os.path.exists(temp_dir):
-        try:
-            shutil.rmtree(temp_dir)
-            os.makedirs(temp_dir)
-            print("✅ Cleaned temporary files")
-        except Exception as e:
-            print(f"❌ Error cleaning temp files: {str(e)}")
+    try:
+        # Empty the directory in place instead of removing and recreating it
+        with os.scandir(temp_dir) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+        print("✅ Cleaned temporary files")
+    except FileNotFoundError:
+        # Nothing to clean; let save_uploaded_file create it again
+        with _ensured_dirs_lock:
+            _ensured_dirs.discard(temp_dir)
+    except Exception as e:
+        print(f"❌ Error cleaning temp files: {str(e)}")
 
 def validate_file_type(filename: str) -> bool:
     """
@@ -114,9 +238,9 @@ def validate_file_type(filename: str) -> bool:
     Returns:
         bool: True if file type is supported
     """
-    supported_extensions = ['.pdf', '.docx']
-    file_extension = os.path.splitext(filename)[1].lower()
-    return file_extension in supported_extensions
+    # Like os.path.splitext, a name made of leading dots has no extension
+    stem, _, file_extension = filename.rpartition('.')
+    return bool(stem.lstrip('.')) and file_extension.lower() in _SUPPORTED_EXTENSIONS
 
 def get_file_size_mb(file_path: str) -> float:
     """
@@ -129,7 +253,9 @@ def get_file_size_mb(file_path: str) -> float:
         float: File size in MB
     """
     try:
-        size_bytes = os.path.getsize(file_path)
+        # A cache would need its own stat() to notice changed files, so the
+        # size is read straight from the single stat() call
+        size_bytes = os.stat(file_path).st_size
         size_mb = size_bytes / (1024 * 1024)
         return round(size_mb, 2)
     except Exception:
@@ -146,9 +272,7 @@ def truncate_text(text: str, max_length: int = 100) -> str:
     Returns:
         str: Truncated text
     """
-    if len(text) <= max_length:
-        return text
-    return text[:max_length] + "..."
+    return text if len(text) <= max_length else f"{text[:max_length]}..."
 
 def extract_filename_without_extension(file_path: str) -> str:
     """
@@ -160,7 +284,10 @@ def extract_filename_without_extension(file_path: str) -> str:
     Returns:
         str: Filename without extension
     """
-    return os.path.splitext(os.path.basename(file_path))[0]
+    name = os.path.basename(file_path)
+    # Like os.path.splitext, a name made of leading dots has no extension
+    stem, _, _ = name.rpartition('.')
+    return stem if stem.lstrip('.') else name
 
 def create_download_link(data: str, filename: str, link_text: str) -> str:
     """
@@ -174,9 +301,7 @@ def create_download_link(data: str, filename: str, link_text: str) -> str:
     Returns:
         str: HTML download link
     """
-    import base64
-    
-    b64 = base64.b64encode(data.encode()).decode()
+    b64 = binascii.b2a_base64(data.encode('utf-8'), newline=False).decode('ascii')
     href = f'<a href="data:file/txt;base64,{b64}" download="{filename}">{link_text}</a>'
     return href
 
@@ -194,24 +319,22 @@ def format_list_for_display(items: list, max_items: int = 5) -> str:
     if not items:
         return "None"
     
-    if len(items) <= max_items:
-        return ", ".join(items)
-    else:
-        displayed_items = items[:max_items]
-        remaining = len(items) - max_items
-        return f"{', '.join(displayed_items)} (+{remaining} more)"
+    shown = ", ".join(islice(items, max_items))
+    remaining = len(items) - max_items
+    return f"{shown} (+{remaining} more)" if remaining > 0 else shown
 
-def calculate_match_statistics(scores: list) -> dict:
+def calculate_match_statistics(scores: Sequence[float]) -> dict:
     """
     Calculate statistics for match scores.
     
     Args:
-        scores (list): List of similarity scores
+        scores (Sequence[float]): Similarity scores, as a list or NumPy array
         
     Returns:
         dict: Statistics dictionary
     """
-    if not scores:
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.size == 0:
         return {
             'mean': 0.0,
             'median': 0.0,
@@ -220,41 +343,61 @@ def calculate_match_statistics(scores: list) -> dict:
             'std': 0.0
         }
     
-    import statistics
-    
     return {
-        'mean': statistics.mean(scores),
-        'median': statistics.median(scores),
-        'min': min(scores),
-        'max': max(scores),
-        'std': statistics.stdev(scores) if len(scores) > 1 else 0.0
+        'mean': float(scores.mean()),
+        'median': float(np.median(scores)),
+        'min': float(scores.min()),
+        'max': float(scores.max()),
+        'std': float(scores.std(ddof=1)) if scores.size > 1 else 0.0
     }
 
-def generate_report_summary(results: list, job_description: str) -> dict:
+class ResultsTable(NamedTuple):
+    """Screening results stored column-wise."""
+    scores: np.ndarray
+    filenames: List[str]
+
+def to_results_table(results) -> ResultsTable:
+    """
+    Convert screening results into a ResultsTable.
+    
+    Args:
+        results: List of result dicts with 'similarity_score' and 'filename',
+            or anything that already has scores and filenames columns
+            (a ResultsTable or job_matcher's RankedResumes)
+        
+    Returns:
+        ResultsTable: Scores as a float64 array and the filenames
+    """
+    if hasattr(results, 'scores') and hasattr(results, 'filenames'):
+        return ResultsTable(np.asarray(results.scores, dtype=np.float64), list(results.filenames))
+    
+    scores = np.fromiter((r['similarity_score'] for r in results), dtype=np.float64, count=len(results))
+    return ResultsTable(scores, [r['filename'] for r in results])
+
+def generate_report_summary(results: Union[list, ResultsTable], job_description: str) -> dict:
     """
     Generate summary report for screening results.
     
     Args:
-        results (list): List of screening results
+        results (Union[list, ResultsTable]): List of screening results, or
+            the results already converted with to_results_table
         job_description (str): Job description text
         
     Returns:
         dict: Summary report
     """
-    if not results:
+    table = to_results_table(results)
+    if not table.filenames:
         return {}
     
-    scores = [r['similarity_score'] for r in results]
+    scores = table.scores
     stats = calculate_match_statistics(scores)
     
-    # Categorize results
-    excellent = sum(1 for score in scores if score >= 0.8)
-    good = sum(1 for score in scores if 0.6 <= score < 0.8)
-    fair = sum(1 for score in scores if 0.4 <= score < 0.6)
-    poor = sum(1 for score in scores if score < 0.4)
+    # Categorize results: < 0.4, [0.4, 0.6), [0.6, 0.8) and >= 0.8
+    poor, fair, good, excellent = np.bincount(np.digitize(scores, SCORE_THRESHOLDS), minlength=4).tolist()
     
     return {
-        'total_resumes': len(results),
+        'total_resumes': len(table.filenames),
         'statistics': stats,
         'categories': {
             'excellent': excellent,
@@ -262,7 +405,7 @@ def generate_report_summary(results: list, job_description: str) -> dict:
             'fair': fair,
             'poor': poor
         },
-        'top_candidate': results[0]['filename'] if results else None,
-        'top_score': max(scores) if scores else 0.0,
+        'top_candidate': table.filenames[int(scores.argmax())],
+        'top_score': stats['max'],
         'job_description_length': len(job_description.split())
     }